@@ -1,16 +1,23 @@
 import fitz  # PyMuPDF for PDF handling
 import os
+import sys
 import pytesseract  # OCR for images
 from PIL import Image as PILImage
 import io
-from typing import TypedDict, Annotated, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, Annotated, Sequence, List
 from langgraph.graph import StateGraph, END
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import tool
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.instrumentation import NodeTracer, track_call, track_llm
+from agent_common.pdf import FITZ_LOCK
+from agent_common.remote import invoke
+from agent_common.routing import get_routed_chat_model
+
 # Load environment variables
 load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
@@ -18,62 +25,126 @@ if not os.environ["OPENAI_API_KEY"]:
     st.error("OPENAI_API_KEY not found in .env file.")
     st.stop()
 
+# OCR settings: a page is OCR'd only when its text layer is too thin
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))  # Render resolution for scanned pages
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "50"))  # Native text needed to skip OCR
+OCR_MIN_IMAGE_COVERAGE = float(os.getenv("OCR_MIN_IMAGE_COVERAGE", "0.5"))  # Share of the page covered by images
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")  # One thread per tesseract process; pages run in parallel instead
+
 # Define LangGraph state
 class DocumentState(TypedDict):
-    pdf_path: str
+    input_type: str  # "pdf_bytes" (in-memory upload) or "pdf_path" (file on disk)
+    pdf_path: str  # Path on disk, or the uploaded file name for pdf_bytes
+    pdf_bytes: bytes
     text_content: Annotated[Sequence[dict], "Extracted text"]
-    image_content: Annotated[Sequence[dict], "Extracted images"]
+    image_content: Annotated[Sequence[dict], "First extracted image"]
+    image_count: int  # Embedded images in the whole document
+    scanned_pages: Annotated[List[int], "Pages without a usable text layer"]
     ocr_results: Annotated[Sequence[dict], "OCR text"]
     reasoning_output: Annotated[Sequence[str], "Analysis results"]
 
+# Open the PDF from memory or from disk depending on the input type
+def open_pdf(state: DocumentState):
+    if state.get("input_type") == "pdf_bytes":
+        return fitz.open(stream=state["pdf_bytes"], filetype="pdf")
+    return fitz.open(state["pdf_path"])
+
+# Share of the page area covered by embedded images
+def image_coverage(page) -> float:
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0.0
+    covered = 0.0
+    for img in page.get_images(full=True):
+        for rect in page.get_image_rects(img[0]):
+            covered += abs(rect & page.rect)
+    return min(covered / page_area, 1.0)
+
+# A page needs OCR when it has little native text and is mostly image (or blank of text)
+def needs_ocr(text: str, coverage: float) -> bool:
+    if len(text) >= OCR_MIN_TEXT_CHARS:
+        return False
+    return coverage >= OCR_MIN_IMAGE_COVERAGE or not text
+
 # Step 1: Extract text and images from PDF
 def extract_content(state: DocumentState) -> DocumentState:
     try:
-        doc = fitz.open(state["pdf_path"])
         text_content = []
         image_content = []
-        for page_num, page in enumerate(doc):
-            text = page.get_text("text").strip()
-            text_content.append({"page": page_num + 1, "text": text})
-            for img in page.get_images(full=True):
-                xref = img[0]
-                base_image = doc.extract_image(xref)
-                image = PILImage.open(io.BytesIO(base_image["image"]))
-                image_content.append({"page": page_num + 1, "image": image})
-        doc.close()
-        return {"text_content": text_content, "image_content": image_content}
+        image_count = 0
+        scanned_pages = []
+        with FITZ_LOCK:
+            doc = open_pdf(state)
+            for page_num, page in enumerate(doc):
+                text = page.get_text("text").strip()
+                if needs_ocr(text, image_coverage(page)):
+                    scanned_pages.append(page_num + 1)
+                else:
+                    text_content.append({"page": page_num + 1, "text": text})
+                images = page.get_images(full=True)
+                # Only the first image is shown; the rest are counted, not decoded
+                if images and not image_content:
+                    base_image = doc.extract_image(images[0][0])
+                    image = PILImage.open(io.BytesIO(base_image["image"]))
+                    image_content.append({"page": page_num + 1, "image": image})
+                image_count += len(images)
+            doc.close()
+        return {"text_content": text_content, "image_content": image_content, "image_count": image_count,
+                "scanned_pages": scanned_pages}
     except Exception as e:
         st.error(f"PDF extraction failed: {e}")
-        return {"text_content": [], "image_content": []}
-
-# Step 2: Perform OCR on images (if any)
-def ocr_images(state: DocumentState) -> DocumentState:
-    ocr_results = []
-    for item in state["image_content"]:
-        text = pytesseract.image_to_string(item["image"]).strip()
-        ocr_results.append({"page": item["page"], "ocr_text": text})
-    return {"ocr_results": ocr_results}
+        return {"text_content": [], "image_content": [], "image_count": 0, "scanned_pages": []}
+
+# Step 2: Render scanned pages once and OCR them in parallel
+def ocr_pages(state: DocumentState) -> DocumentState:
+    pages = state["scanned_pages"]
+    results = {}
+    # PyMuPDF is not thread-safe, so pages are rendered here one at a time (under FITZ_LOCK,
+    # shared with other jobs in this process) while tesseract runs on the worker threads;
+    # at most 2 * OCR_WORKERS pages are held in memory.
+    with ThreadPoolExecutor(max_workers=OCR_WORKERS) as executor:
+        with FITZ_LOCK:
+            doc = open_pdf(state)
+        try:
+            pending = {}
+            for page_num in pages:
+                with FITZ_LOCK:
+                    pix = doc[page_num - 1].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+                    image = PILImage.frombytes("L", (pix.width, pix.height), pix.samples)
+                pending[page_num] = executor.submit(pytesseract.image_to_string, image)
+                if len(pending) >= 2 * OCR_WORKERS:
+                    done_page = min(pending)
+                    results[done_page] = pending.pop(done_page).result().strip()
+            for page_num, future in pending.items():
+                results[page_num] = future.result().strip()
+        finally:
+            with FITZ_LOCK:
+                doc.close()
+    track_call("ocr", len(pages))
+    return {"ocr_results": [{"page": page_num, "ocr_text": results[page_num]} for page_num in pages]}
 
 # Step 3: Analyze document content
 def reason_content(state: DocumentState) -> DocumentState:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    llm = get_routed_chat_model("openai", "gpt-4o-mini", call_site="document_extractor.reason", temperature=0.2)
     prompt = ChatPromptTemplate.from_template(
         "Analyze this document:\nText: {text}\nOCR: {ocr}\nAnswer:\n1. Main topic?\n2. Charts/tables?\n3. Key info?"
     )
     text = " ".join([item["text"] for item in state["text_content"]]) or "No text"
     ocr = " ".join([item["ocr_text"] for item in state.get("ocr_results", [])]) or "No OCR"
-    reasoning = llm.invoke(prompt.format(text=text, ocr=ocr)).content.split("\n")
+    reasoning = track_llm(llm.invoke(prompt.format(text=text, ocr=ocr))).content.split("\n")
     return {"reasoning_output": reasoning}
 
 # Conditional routing
 def route_to_ocr_or_reason(state: DocumentState) -> str:
-    return "ocr" if state["image_content"] else "reason"
+    return "ocr" if state["scanned_pages"] else "reason"
 
 # Build LangGraph workflow
+tracer = NodeTracer("document_extractor")
 workflow = StateGraph(DocumentState)
-workflow.add_node("extract", extract_content)
-workflow.add_node("ocr", ocr_images)
-workflow.add_node("reason", reason_content)
+workflow.add_node("extract", tracer.wrap("extract", extract_content))
+workflow.add_node("ocr", tracer.wrap("ocr", ocr_pages))
+workflow.add_node("reason", tracer.wrap("reason", reason_content))
 workflow.set_entry_point("extract")
 workflow.add_conditional_edges("extract", route_to_ocr_or_reason, {"ocr": "ocr", "reason": "reason"})
 workflow.add_edge("ocr", "reason")
@@ -84,11 +155,11 @@ app = workflow.compile()
 @tool
 def answer_question(question: str, context: str) -> str:
     """Answer a question based on the document content."""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    llm = get_routed_chat_model("openai", "gpt-4o-mini", call_site="document_extractor.answer", temperature=0.2)
     prompt = ChatPromptTemplate.from_template(
         "Document content: {context}\nQuestion: {question}\nAnswer concisely:"
     )
-    return llm.invoke(prompt.format(context=context, question=question)).content
+    return track_llm(llm.invoke(prompt.format(context=context, question=question))).content
 
 # Streamlit UI
 def main():
@@ -108,16 +179,17 @@ def main():
         st.session_state.chat = []
 
     if uploaded_file:
-        pdf_path = f"temp_{uploaded_file.name}"
-        with open(pdf_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
         if st.button("Process Medical Report"):
             with st.spinner("Processing your Medical Report..."):
-                result = app.invoke({
-                    "pdf_path": pdf_path,
+                # The upload is parsed straight from memory; nothing is written to disk
+                result = invoke("document_extractor", app, {
+                    "input_type": "pdf_bytes",
+                    "pdf_path": uploaded_file.name,
+                    "pdf_bytes": uploaded_file.getvalue(),
                     "text_content": [],
                     "image_content": [],
+                    "image_count": 0,
+                    "scanned_pages": [],
                     "ocr_results": [],
                     "reasoning_output": []
                 })
@@ -135,7 +207,7 @@ def main():
                 for item in result.get("ocr_results", []):
                     st.write(f"Page {item['page']}: {item['ocr_text'][:200]}...")
                 if not result.get("ocr_results"):
-                    st.write("No images for OCR.")
+                    st.write("No scanned pages needed OCR.")
 
                 st.subheader("Analysing the Report ")
                 for line in result["reasoning_output"]:
@@ -145,10 +217,6 @@ def main():
                     st.image(result["image_content"][0]["image"], 
                             caption=f"Image from Page {result['image_content'][0]['page']}")
 
-        # Clean up
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
-
     # Chat section
     if st.session_state.context:
         st.subheader("Chat with PDF")
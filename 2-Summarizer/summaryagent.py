@@ -1,12 +1,21 @@
 import fitz  # PyMuPDF for PDF handling
 import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, Annotated, Sequence
 from langgraph.graph import StateGraph, END
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.instrumentation import NodeTracer, track_llm
+from agent_common.pdf import FITZ_LOCK
+from agent_common.remote import invoke, server_url, upload
+from agent_common.routing import get_routed_chat_model
+from agent_common.text_chunks import iter_text_chunks
+
 # Load environment variables
 load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
@@ -14,40 +23,112 @@ if not os.environ["OPENAI_API_KEY"]:
     st.error("OPENAI_API_KEY not found in .env file.")
     st.stop()
 
+# Large text settings
+SUMMARY_CHUNK_CHARS = int(os.getenv("SUMMARY_CHUNK_CHARS", "12000"))  # Characters per map step and per reduce group
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))  # Concurrent chunk summaries
+PREVIEW_CHARS = 500
+
 # Define state for LangGraph
 class SummaryState(TypedDict):
-    input_path: str  # Path to PDF or text input
-    text_content: Annotated[Sequence[str], "Extracted text"]
+    input_type: str  # "pdf_bytes", "pdf_path", "text", "text_file" or "text_bytes"
+    input_path: str  # Path to a PDF or .txt/.md file on disk, or the uploaded file name
+    pdf_bytes: bytes  # In-memory PDF upload
+    text_bytes: bytes  # In-memory .txt/.md upload
+    input_text: str  # Raw text input
+    text_content: Annotated[Sequence[str], "Extracted text"]  # Left empty for text files, which are streamed
+    text_preview: str  # Start of the text, for display
+    chunks: int  # Chunks summarized for text files
     summary: Annotated[str, "Generated summary"]
 
+def text_preview(source) -> str:
+    return next(iter_text_chunks(source, PREVIEW_CHARS), "")[:PREVIEW_CHARS]
+
 # Node 1: Extract text from input (PDF or text)
 def extract(state: SummaryState) -> SummaryState:
     try:
-        if state["input_path"].endswith(".pdf"):
-            doc = fitz.open(state["input_path"])
-            text_content = [page.get_text("text").strip() for page in doc]
-            doc.close()
-        else:
-            text_content = [state["input_path"]]  # Treat as raw text input
-        return {"text_content": text_content}
+        input_type = state.get("input_type", "pdf_path")
+        if input_type in ("pdf_bytes", "pdf_path"):
+            with FITZ_LOCK:
+                if input_type == "pdf_bytes":
+                    doc = fitz.open(stream=state["pdf_bytes"], filetype="pdf")
+                else:
+                    doc = fitz.open(state["input_path"])
+                text_content = [page.get_text("text").strip() for page in doc]
+                doc.close()
+            preview = ""
+            for page_text in text_content:
+                preview = f"{preview} {page_text}".strip()
+                if len(preview) >= PREVIEW_CHARS:
+                    break
+            return {"text_content": text_content, "text_preview": preview[:PREVIEW_CHARS]}
+        if input_type in ("text_file", "text_bytes"):
+            # The file itself is streamed in summarize; only its start is kept in state
+            source = state["input_path"] if input_type == "text_file" else state["text_bytes"]
+            return {"text_content": [], "text_preview": text_preview(source)}
+        return {"text_content": [state["input_text"]], "text_preview": state["input_text"][:PREVIEW_CHARS]}
     except Exception as e:
         st.error(f"Extraction failed: {e}")
-        return {"text_content": ["No text extracted"]}
+        return {"text_content": ["No text extracted"], "text_preview": ""}
+
+summary_prompt = ChatPromptTemplate.from_template(
+    "Summarize this text concisely:\n\n{text}\n\nSummary:"
+)
+reduce_prompt = ChatPromptTemplate.from_template(
+    "These are summaries of consecutive parts of one document. "
+    "Combine them into one concise summary of the whole document:\n\n{text}\n\nSummary:"
+)
+
+def summarize_each(llm, prompt, texts):
+    """Summarize each text, keeping at most 2 * SUMMARY_WORKERS in flight; yields summaries in order."""
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS) as pool:
+        for text in texts:
+            pending.append(pool.submit(llm.invoke, prompt.format(text=text)))
+            if len(pending) >= 2 * SUMMARY_WORKERS:
+                yield track_llm(pending.popleft().result()).content.strip()
+        while pending:
+            yield track_llm(pending.popleft().result()).content.strip()
+
+def reduce_groups(summaries):
+    """Group summaries into runs of about SUMMARY_CHUNK_CHARS, at least two per run."""
+    group, size = [], 0
+    for summary in summaries:
+        if len(group) >= 2 and size + len(summary) > SUMMARY_CHUNK_CHARS:
+            yield "\n\n".join(group)
+            group, size = [], 0
+        group.append(summary)
+        size += len(summary)
+    if group:
+        yield "\n\n".join(group)
+
+def summarize_chunks(llm, chunks):
+    """Map-reduce summary: summarize each chunk, then combine the summaries level by level."""
+    summaries = list(summarize_each(llm, summary_prompt, chunks))
+    count = len(summaries)
+    if not summaries:
+        summaries = list(summarize_each(llm, summary_prompt, ["No text to summarize"]))
+    while len(summaries) > 1:
+        summaries = list(summarize_each(llm, reduce_prompt, reduce_groups(summaries)))
+    return summaries[0], count
 
 # Node 2: Summarize the text
 def summarize(state: SummaryState) -> SummaryState:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
-    prompt = ChatPromptTemplate.from_template(
-        "Summarize this text concisely:\n\n{text}\n\nSummary:"
-    )
+    if state.get("input_type") in ("text_file", "text_bytes"):
+        # Chunk-sized prompts get their own hedge delay, apart from whole-document calls
+        llm = get_routed_chat_model("openai", "gpt-4o-mini", call_site="summarizer.chunks", temperature=0.2)
+        source = state["input_path"] if state["input_type"] == "text_file" else state["text_bytes"]
+        summary, chunks = summarize_chunks(llm, iter_text_chunks(source, SUMMARY_CHUNK_CHARS))
+        return {"summary": summary, "chunks": chunks}
+    llm = get_routed_chat_model("openai", "gpt-4o-mini", call_site="summarizer", temperature=0.2)
     text = " ".join(state["text_content"]) or "No text to summarize"
-    summary = llm.invoke(prompt.format(text=text)).content.strip()
+    summary = track_llm(llm.invoke(summary_prompt.format(text=text))).content.strip()
     return {"summary": summary}
 
 # Build LangGraph workflow
+tracer = NodeTracer("summarizer")
 workflow = StateGraph(SummaryState)
-workflow.add_node("extract", extract)
-workflow.add_node("summarize", summarize)
+workflow.add_node("extract", tracer.wrap("extract", extract))
+workflow.add_node("summarize", tracer.wrap("summarize", summarize))
 workflow.set_entry_point("extract")
 workflow.add_edge("extract", "summarize")
 workflow.add_edge("summarize", END)
@@ -68,39 +149,45 @@ def main():
         st.text("Workflow: extract → summarize → end")
 
     # Input options
-    input_type = st.radio("Choose input type:", ("PDF", "Text"))
-    input_content = None
-    
+    input_type = st.radio("Choose input type:", ("PDF", "Text", "Text file"))
+    initial_state = None
+
     if input_type == "PDF":
         uploaded_file = st.file_uploader("Upload a PDF", type="pdf")
         if uploaded_file:
-            pdf_path = f"temp_{uploaded_file.name}"
-            with open(pdf_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            input_content = pdf_path
+            # The upload is parsed straight from memory; nothing is written to disk
+            initial_state = {"input_type": "pdf_bytes", "input_path": uploaded_file.name,
+                             "pdf_bytes": uploaded_file.getvalue()}
+    elif input_type == "Text file":
+        uploaded_file = st.file_uploader("Upload a .txt or .md file", type=["txt", "md"])
+        if uploaded_file:
+            # Large files are summarized chunk by chunk, never decoded as a whole
+            initial_state = {"input_type": "text_bytes", "input_path": uploaded_file.name,
+                             "text_bytes": uploaded_file.getvalue()}
     else:
-        input_content = st.text_area("Enter text to summarize", height=200)
+        input_text = st.text_area("Enter text to summarize", height=200)
+        if input_text:
+            initial_state = {"input_type": "text", "input_text": input_text}
 
-    if input_content and st.button("Summarize"):
+    if initial_state and st.button("Summarize"):
         with st.spinner("Generating summary..."):
+            if initial_state["input_type"] == "text_bytes" and server_url():
+                # The job server streams the file from its upload spool instead of a base64 JSON copy
+                initial_state = {"input_type": "text_file", "input_path": upload(initial_state["text_bytes"])}
             # Run the workflow
-            result = app.invoke({
-                "input_path": input_content,
+            result = invoke("summarizer", app, {
+                **initial_state,
                 "text_content": [],
                 "summary": ""
             })
             
             # Display results
             st.subheader("Extracted Text")
-            full_text = " ".join(result["text_content"])
-            st.write(full_text[:500] + "..." if len(full_text) > 500 else full_text)
+            preview = result.get("text_preview", "")
+            st.write(preview + "..." if len(preview) >= PREVIEW_CHARS else preview)
             
             st.subheader("Final Summary of the Extracted Data ")
             st.write(result["summary"])
 
-        # Clean up PDF file if used
-        if input_type == "PDF" and os.path.exists(input_content):
-            os.remove(input_content)
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
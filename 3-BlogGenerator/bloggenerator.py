@@ -1,16 +1,24 @@
 import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 from langchain_community.tools.tavily_search.tool import TavilySearchResults
 from langgraph.graph import StateGraph, END
 from typing import TypedDict
 from PIL import Image
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.instrumentation import NodeTracer, track_cache_hit, track_call, track_llm
+from agent_common.remote import invoke
+from agent_common.routing import get_routed_chat_model
+from agent_common.topics import cluster_topics
+
 # Load environment variables
 load_dotenv()
-os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY1")
-os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
+os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY1", "")
+os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY", "")
 
 # Check API keys
 if not os.getenv("GROQ_API_KEY") or not os.getenv("TAVILY_API_KEY"):
@@ -18,9 +26,12 @@ if not os.getenv("GROQ_API_KEY") or not os.getenv("TAVILY_API_KEY"):
     st.stop()
 
 # Initialize LLM and search tool
-llm = ChatGroq(model="mixtral-8x7b-32768", temperature=0.7)
+llm = get_routed_chat_model("groq", "mixtral-8x7b-32768", call_site="blog_generator", temperature=0.7)
 web_search = TavilySearchResults(max_results=3)
 
+# Bulk mode settings
+BULK_WORKERS = int(os.getenv("BLOG_BULK_WORKERS", "4"))  # Concurrent searches and blog writes
+
 # Define state
 class BlogState(TypedDict):
     topic: str
@@ -30,8 +41,13 @@ class BlogState(TypedDict):
 
 # Workflow nodes
 def research_topic(state: BlogState) -> BlogState:
+    # Research shared by a bulk cluster (or kept from an earlier run) is reused as is
+    if state.get("research"):
+        track_cache_hit()
+        return {}
     topic = state["topic"]
     results = web_search.run(topic) or []
+    track_call("tavily")
     research = "\n".join([r.get("content", "") for r in results if r.get("content")])
     if not research:
         research = "No info found."
@@ -39,7 +55,7 @@ def research_topic(state: BlogState) -> BlogState:
 
 def write_blog(state: BlogState) -> BlogState:
     prompt = f"Write a short, engaging blog post on '{state['topic']}' using this info:\n{state['research']}"
-    blog = llm.invoke(prompt).content
+    blog = track_llm(llm.invoke(prompt)).content
     return {"blog": blog}
 
 def handle_feedback(state: BlogState) -> BlogState:
@@ -47,50 +63,163 @@ def handle_feedback(state: BlogState) -> BlogState:
     if not feedback or "improve" not in feedback.lower():
         return state
     prompt = f"Refine this blog based on feedback '{feedback}':\n{state['blog']}"
-    blog = llm.invoke(prompt).content
+    blog = track_llm(llm.invoke(prompt)).content
     return {"blog": blog}
 
 # Build workflow (around line 54-56 in your file)
+tracer = NodeTracer("blog_generator")
 workflow = StateGraph(BlogState)
-workflow.add_node("research_node", research_topic)  # Line ~54
-workflow.add_node("write_node", write_blog)        # Line ~55 (renamed for consistency)
-workflow.add_node("feedback_node", handle_feedback) # Line 56 (fixed from "feedback")
+workflow.add_node("research_node", tracer.wrap("research_node", research_topic))  # Line ~54
+workflow.add_node("write_node", tracer.wrap("write_node", write_blog))        # Line ~55 (renamed for consistency)
+workflow.add_node("feedback_node", tracer.wrap("feedback_node", handle_feedback)) # Line 56 (fixed from "feedback")
 workflow.set_entry_point("research_node")
 workflow.add_edge("research_node", "write_node")
 workflow.add_edge("write_node", "feedback_node")
 workflow.add_edge("feedback_node", END)
 app = workflow.compile()
 
+# Bulk mode
+def bulk_generate(topics, max_workers: int = BULK_WORKERS, on_post=None) -> dict:
+    """Generate a blog per topic, sharing one search per cluster of related topics.
+
+    Searches and blog writes run on at most max_workers threads. on_post(post)
+    is called from the calling thread as each blog finishes, with the topic,
+    blog, cluster query, seconds and any error. A failed search is reported
+    as an error on each post of its cluster; other clusters carry on. Returns a report comparing
+    the search calls and wall time with running the topics one by one.
+    """
+    start = time.perf_counter()
+    clusters = cluster_topics(topics)
+    traced_research = tracer.wrap("research_node", research_topic)
+
+    def search(cluster):
+        t0 = time.perf_counter()
+        research = traced_research({"topic": cluster["query"], "research": ""})["research"]
+        return research, time.perf_counter() - t0
+
+    def write(topic, cluster):
+        t0 = time.perf_counter()
+        result = invoke("blog_generator", app, {"topic": topic, "research": cluster["research"], "blog": "", "feedback": ""})
+        return result["blog"], time.perf_counter() - t0
+
+    posts = []
+
+    def deliver(post):
+        posts.append(post)
+        if on_post:
+            on_post(post)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        # A cluster's blogs are queued as soon as its own search finishes
+        pending = {pool.submit(search, cluster): (cluster, None) for cluster in clusters}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                cluster, topic = pending.pop(future)
+                if topic is None:
+                    try:
+                        cluster["research"], cluster["search_s"] = future.result()
+                    except Exception as e:
+                        # A failed search fails only the posts of its own cluster
+                        cluster["search_s"] = 0.0
+                        cluster["error"] = f"Search failed: {e}"
+                        for topic in cluster["topics"]:
+                            deliver({"topic": topic, "blog": "", "cluster": cluster["query"], "seconds": 0.0,
+                                     "error": cluster["error"]})
+                        continue
+                    for topic in cluster["topics"]:
+                        pending[pool.submit(write, topic, cluster)] = (cluster, topic)
+                    continue
+                try:
+                    blog, seconds = future.result()
+                    post = {"topic": topic, "blog": blog, "cluster": cluster["query"], "seconds": seconds, "error": None}
+                except Exception as e:
+                    post = {"topic": topic, "blog": "", "cluster": cluster["query"], "seconds": 0.0, "error": str(e)}
+                deliver(post)
+
+    # One by one, every topic would pay for its own search and its own write
+    sequential_s = sum(c["search_s"] * len(c["topics"]) for c in clusters) + sum(p["seconds"] for p in posts)
+    wall_time_s = time.perf_counter() - start
+    unique = sum(len(c["topics"]) for c in clusters)
+    return {
+        "topics": len(topics),
+        "unique_topics": unique,
+        "clusters": len(clusters),
+        "search_calls": len(clusters),
+        "search_calls_saved": unique - len(clusters),
+        "duplicates_dropped": len(topics) - unique,
+        "search_errors": sum(1 for c in clusters if c.get("error")),
+        "errors": sum(1 for p in posts if p["error"]),
+        "wall_time_s": round(wall_time_s, 2),
+        "sequential_estimate_s": round(sequential_s, 2),
+        "speedup": round(sequential_s / wall_time_s, 2) if wall_time_s else None,
+    }
+
+def bulk_ui():
+    st.write("Enter one topic per line. Topics on the same subject (e.g. its features and its performance) share a single web search.")
+    text = st.text_area("Blog Topics", "X200 camera low light features\nX200 camera low light performance\nX200 camera battery life\nX200 camera battery life tips")
+    workers = st.slider("Blogs written in parallel", min_value=1, max_value=16, value=BULK_WORKERS)
+    topics = [line.strip() for line in text.splitlines() if line.strip()]
+    if st.button("Generate Blogs") and topics:
+        total = sum(len(c["topics"]) for c in cluster_topics(topics))
+        progress = st.progress(0.0)
+        done = []
+
+        def show(post):
+            done.append(post)
+            progress.progress(len(done) / total)
+            st.subheader(post["topic"])
+            if post["error"]:
+                st.error(f"Failed: {post['error']}")
+            else:
+                st.write(post["blog"])
+
+        with st.spinner("Generating blogs..."):
+            report = bulk_generate(topics, max_workers=workers, on_post=show)
+        progress.progress(1.0)
+        st.success(f"{report['unique_topics']} blogs in {report['wall_time_s']}s "
+                   f"(about {report['sequential_estimate_s']}s one by one); "
+                   f"{report['search_calls_saved']} web searches saved across {report['clusters']} clusters.")
+        st.json(report)
+
 # Streamlit UI
-st.title("Blog Generator using Langgraph - Agentic AI")
-# Generate Workflow Graph
-
-graph_png=app.get_graph(xray=True).draw_mermaid_png() 
-with st.expander("View Workflow Graph - Furquan"):
-    st.image(graph_png, caption="Blog Generator Workflow Graph", use_container_width=100)
-
-st.write("Enter a topic to generate a blog post, I will search for you.")
-topic = st.text_input("Blog Topic - eg : Benefits of Search & AI")
-if st.button("Generate Blog") and topic:
-    with st.spinner("Generating blog..."):
-        initial_state = {"topic": topic, "research": "", "blog": "", "feedback": ""}
-        result = app.invoke(initial_state)
-        st.session_state.result = result
-        st.subheader("Generated Blog after Searching the Web")
-        st.write(result["blog"])
-
-if "result" in st.session_state:
-    with st.form(key="feedback_form"):
-        feedback = st.text_area("Feedback (use 'improve' to refine, e.g., 'improve clarity'):", "")
-        submit = st.form_submit_button("Submit your Feedback")
-    if submit and feedback:
-        with st.spinner("Updating blog after getting your Feedback..."):
-            feedback_state = {**st.session_state.result, "feedback": feedback}
-            updated_result = app.invoke(feedback_state)
-            st.session_state.result = updated_result
-            st.success("Your Feedback applied!")
-            st.subheader("Updated Blog")
-            st.write(updated_result["blog"])
-
-if not topic:
-    st.warning("Please enter a topic.")
\ No newline at end of file
+def main():
+    st.title("Blog Generator using Langgraph - Agentic AI")
+    # Generate Workflow Graph
+
+    graph_png=app.get_graph(xray=True).draw_mermaid_png() 
+    with st.expander("View Workflow Graph - Furquan"):
+        st.image(graph_png, caption="Blog Generator Workflow Graph", use_container_width=100)
+
+    if st.radio("Mode", ["Single topic", "Bulk topics"], horizontal=True) == "Bulk topics":
+        bulk_ui()
+        return
+
+    st.write("Enter a topic to generate a blog post, I will search for you.")
+    topic = st.text_input("Blog Topic - eg : Benefits of Search & AI")
+    if st.button("Generate Blog") and topic:
+        with st.spinner("Generating blog..."):
+            initial_state = {"topic": topic, "research": "", "blog": "", "feedback": ""}
+            result = invoke("blog_generator", app, initial_state)
+            st.session_state.result = result
+            st.subheader("Generated Blog after Searching the Web")
+            st.write(result["blog"])
+
+    if "result" in st.session_state:
+        with st.form(key="feedback_form"):
+            feedback = st.text_area("Feedback (use 'improve' to refine, e.g., 'improve clarity'):", "")
+            submit = st.form_submit_button("Submit your Feedback")
+        if submit and feedback:
+            with st.spinner("Updating blog after getting your Feedback..."):
+                feedback_state = {**st.session_state.result, "feedback": feedback}
+                updated_result = invoke("blog_generator", app, feedback_state)
+                st.session_state.result = updated_result
+                st.success("Your Feedback applied!")
+                st.subheader("Updated Blog")
+                st.write(updated_result["blog"])
+
+    if not topic:
+        st.warning("Please enter a topic.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import sys
 import streamlit as st
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
@@ -6,14 +7,18 @@ from typing import TypedDict, Any
 from PIL import Image
 import io
 import base64
-from openai import OpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.clients import get_openai_client
+from agent_common.instrumentation import NodeTracer, track_llm
+from agent_common.remote import invoke
 
 load_dotenv()
 if not os.getenv("OPENAI_API_KEY"):
     st.error("Missing OPENAI_API_KEY in .env file.")
     st.stop()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client(api_key=os.getenv("OPENAI_API_KEY"))
 
 class ImageState(TypedDict):
     image: Any
@@ -33,31 +38,38 @@ def describe_image(state: ImageState) -> ImageState:
             ]}
         ]
     )
+    track_llm(response)
     return {"description": response.choices[0].message.content}
 
+tracer = NodeTracer("image_recognition")
 workflow = StateGraph(ImageState)
-workflow.add_node("upload_node", upload_image)
-workflow.add_node("describe_node", describe_image)
+workflow.add_node("upload_node", tracer.wrap("upload_node", upload_image))
+workflow.add_node("describe_node", tracer.wrap("describe_node", describe_image))
 workflow.set_entry_point("upload_node")
 workflow.add_edge("upload_node", "describe_node")
 workflow.add_edge("describe_node", END)
 app = workflow.compile()
 
-st.title("Animal Image Recognition ")
-st.write("Upload a small JPG image of an animal (e.g., 200x200 pixels).")
-graph_png=app.get_graph(xray=True).draw_mermaid_png() 
-with st.expander("View Image  Graph Workflow - Furquan"):
-    st.image(graph_png, caption="Image Recognization Workflow Graph", use_container_width=100)
-
-
-uploaded_file = st.file_uploader("Choose an image...", type=["jpg"])
-if uploaded_file:
-    image = Image.open(uploaded_file).resize((200, 200), Image.Resampling.LANCZOS)
-    st.image(image, caption="Uploaded Animal Image", use_container_width=250)
-    with st.spinner("Recognizing animal..."):
-        image_bytes = io.BytesIO()
-        image.save(image_bytes, format="JPEG")
-        initial_state = {"image": image_bytes.getvalue(), "description": ""}
-        result = app.invoke(initial_state)
-        st.subheader("Animal Description")
-        st.write(result["description"])
\ No newline at end of file
+# Streamlit UI
+def main():
+    st.title("Animal Image Recognition ")
+    st.write("Upload a small JPG image of an animal (e.g., 200x200 pixels).")
+    graph_png=app.get_graph(xray=True).draw_mermaid_png() 
+    with st.expander("View Image  Graph Workflow - Furquan"):
+        st.image(graph_png, caption="Image Recognization Workflow Graph", use_container_width=100)
+
+
+    uploaded_file = st.file_uploader("Choose an image...", type=["jpg"])
+    if uploaded_file:
+        image = Image.open(uploaded_file).resize((200, 200), Image.Resampling.LANCZOS)
+        st.image(image, caption="Uploaded Animal Image", use_container_width=250)
+        with st.spinner("Recognizing animal..."):
+            image_bytes = io.BytesIO()
+            image.save(image_bytes, format="JPEG")
+            initial_state = {"image": image_bytes.getvalue(), "description": ""}
+            result = invoke("image_recognition", app, initial_state)
+            st.subheader("Animal Description")
+            st.write(result["description"])
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
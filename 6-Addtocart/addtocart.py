@@ -1,5 +1,8 @@
+import os
+import sys
 import time
 from typing import TypedDict
+from urllib.parse import urlparse
 from langgraph.graph import StateGraph, END
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -8,6 +11,17 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from duckduckgo_search import DDGS
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.instrumentation import NodeTracer, track_call
+
+# Shop to drive; point at a local mock site for offline runs
+SHOP_BASE_URL = os.getenv("SHOP_BASE_URL", "https://www.amazon.com").rstrip("/")
+SHOP_DOMAIN = urlparse(SHOP_BASE_URL).netloc.removeprefix("www.")
+CART_UPDATE_WAIT = 2  # Seconds to wait for the cart to update after clicking
+TRACK_CHECKS = int(os.getenv("SHOP_TRACK_CHECKS", "10"))  # Order-history checks before giving up
+TRACK_INTERVAL = 30  # Seconds between order-history checks
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")  # Unset: Selenium locates a matching chromedriver
+
 # Define the agent's state
 class ShoppingState(TypedDict):
     driver: webdriver.Chrome
@@ -16,10 +30,13 @@ class ShoppingState(TypedDict):
     payment_done: bool
     shipping_status: str
     tracking_url: str
+    order_id: str  # Order to track; empty tracks the newest order
+    max_checks: int  # Order-history checks before tracking gives up
+    interactive: bool  # Prompt on the console for checkout; False stops at "awaiting_payment"
 
 # Initialize Selenium WebDriver
 def setup_driver():
-    service = Service(executable_path="C:/agenticAI/AgenticAIWorkspace/8-ExtractPDF Furquan/chromedriver.exe")  # Update path if needed
+    service = Service(executable_path=CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else Service()
     driver = webdriver.Chrome(service=service)
     return driver
 
@@ -27,11 +44,12 @@ def setup_driver():
 def search_razor(state: ShoppingState) -> ShoppingState:
     print("Searching for Gillette razor...")
     with DDGS() as ddgs:
-        query = "razor site:amazon.com Gillette inurl:/dp/"  # Target product pages
+        query = f"razor site:{SHOP_DOMAIN} Gillette inurl:/dp/"  # Target product pages
         results = ddgs.text(query, max_results=10)
+        track_call("ddg")
         for result in results:
             url = result["href"]
-            if "Gillette" in result["title"] and "amazon.com" in url and "/dp/" in url:
+            if "Gillette" in result["title"] and SHOP_DOMAIN in url and "/dp/" in url:
                 print(f"Selected product URL: {url}")
                 return {"product_url": url, "in_cart": False}
     print("No Gillette razor product page found.")
@@ -45,13 +63,14 @@ def add_to_cart(state: ShoppingState) -> ShoppingState:
     print("Adding Gillette razor to cart...")
     driver = state["driver"]
     driver.get(state["product_url"])
+    track_call("browser")
     try:
         # Wait for "Add to Cart" button
         add_button = WebDriverWait(driver, 15).until(
             EC.element_to_be_clickable((By.ID, "add-to-cart-button"))
         )
         add_button.click()
-        time.sleep(2)  # Wait for cart to update
+        time.sleep(CART_UPDATE_WAIT)  # Wait for cart to update
         print("Successfully added to cart.")
         return {"in_cart": True}
     except Exception as e:
@@ -66,10 +85,23 @@ def wait_for_payment(state: ShoppingState) -> ShoppingState:
         print("Cart is empty, stopping.")
         return state
     driver = state["driver"]
-    driver.get("https://www.amazon.com/gp/cart/view.html")
+    driver.get(f"{SHOP_BASE_URL}/gp/cart/view.html")
+    track_call("browser")
+    if not state.get("interactive", True):
+        # Nobody is at the console: stop with the item in the cart. The caller owns the
+        # browser and checkout; once paid, track_order() follows the order
+        print("Item is in the cart, awaiting payment.")
+        return {"payment_done": False, "shipping_status": "awaiting_payment"}
     print("Please log in, enter your credit card details, and complete checkout.")
-    input("Press Enter after payment to resume tracking...")
-    return {"payment_done": True}
+    order_id = input("Enter the order number to track (blank for the newest order): ").strip()
+    return {"payment_done": True, "order_id": order_id}
+
+# The order card for order_id in the order history, or the newest one when no id is given
+def find_order(driver, order_id: str):
+    orders = driver.find_elements(By.CLASS_NAME, "order")
+    if not order_id:
+        return orders[0] if orders else None
+    return next((order for order in orders if order_id in order.text), None)
 
 # Node 4: Track shipping
 def track_shipping(state: ShoppingState) -> ShoppingState:
@@ -77,18 +109,23 @@ def track_shipping(state: ShoppingState) -> ShoppingState:
         print("Payment not completed, stopping.")
         return state
     driver = state["driver"]
-    driver.get("https://www.amazon.com/gp/your-account/order-history")
+    driver.get(f"{SHOP_BASE_URL}/gp/your-account/order-history")
+    track_call("browser")
     print("Tracking order status...")
-    max_attempts = 10  # Limit retries
+    order_id = state.get("order_id", "")
+    max_attempts = state.get("max_checks") or TRACK_CHECKS  # Limit retries
     attempt = 0
     while attempt < max_attempts:
         try:
-            status = WebDriverWait(driver, 15).until(
+            WebDriverWait(driver, 15).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "order"))
             )
+            status = find_order(driver, order_id)
+            if status is None:
+                raise ValueError(f"Order {order_id or '(newest)'} is not in the order history yet")
             status_text = status.text.lower()
             if "shipped" in status_text:
-                tracking_link = driver.find_element(By.XPATH, "//a[contains(text(), 'Track')]")
+                tracking_link = status.find_element(By.XPATH, ".//a[contains(text(), 'Track')]")
                 print("Order has shipped!")
                 return {
                     "shipping_status": "shipped",
@@ -98,24 +135,27 @@ def track_shipping(state: ShoppingState) -> ShoppingState:
                 print("Order delivered!")
                 return {"shipping_status": "delivered", "tracking_url": ""}
             else:
-                print("Order not yet shipped. Checking again in 30 seconds...")
-                time.sleep(30)
-                driver.refresh()
+                print("Order not yet shipped.")
         except Exception as e:
             print(f"Error tracking: {e}")
-            time.sleep(30)
-            driver.refresh()
         attempt += 1
+        if attempt < max_attempts:
+            print(f"Checking again in {TRACK_INTERVAL} seconds...")
+            time.sleep(TRACK_INTERVAL)
+            driver.refresh()
+            track_call("browser")
     print("Tracking timed out after max attempts.")
     return {"shipping_status": "pending"}
 
+tracer = NodeTracer("add_to_cart")
+
 # Build the agentic workflow
 def build_workflow():
     workflow = StateGraph(ShoppingState)
-    workflow.add_node("search", search_razor)
-    workflow.add_node("cart", add_to_cart)
-    workflow.add_node("payment", wait_for_payment)
-    workflow.add_node("track", track_shipping)
+    workflow.add_node("search", tracer.wrap("search", search_razor))
+    workflow.add_node("cart", tracer.wrap("cart", add_to_cart))
+    workflow.add_node("payment", tracer.wrap("payment", wait_for_payment))
+    workflow.add_node("track", tracer.wrap("track", track_shipping))
     workflow.set_entry_point("search")
     workflow.add_edge("search", "cart")
     workflow.add_edge("cart", "payment")
@@ -124,7 +164,7 @@ def build_workflow():
     return workflow.compile()
 
 # Run the agent
-def run_shopping_agent():
+def run_shopping_agent(interactive: bool = True):
     driver = setup_driver()
     initial_state = {
         "driver": driver,
@@ -132,7 +172,10 @@ def run_shopping_agent():
         "in_cart": False,
         "payment_done": False,
         "shipping_status": "pending",
-        "tracking_url": ""
+        "tracking_url": "",
+        "order_id": "",
+        "max_checks": TRACK_CHECKS,
+        "interactive": interactive
     }
     try:
         app = build_workflow()
@@ -143,9 +186,28 @@ def run_shopping_agent():
         print(f"Payment Done: {final_state['payment_done']}")
         print(f"Shipping Status: {final_state['shipping_status']}")
         print(f"Tracking URL: {final_state['tracking_url']}")
+        # The driver is closed below, so it is not part of the returned state
+        return {k: v for k, v in final_state.items() if k != "driver"}
     finally:
         driver.quit()
         print("Agent completed.")
 
+# Track an order paid for after a non-interactive run stopped at "awaiting_payment"
+def track_order(order_id: str, max_checks: int = TRACK_CHECKS):
+    driver = setup_driver()
+    try:
+        state = tracer.wrap("track", track_shipping)({
+            "driver": driver,
+            "payment_done": True,
+            "order_id": order_id,
+            "max_checks": max_checks,
+            "shipping_status": "pending",
+            "tracking_url": ""
+        })
+        return {"order_id": order_id, "shipping_status": state.get("shipping_status", "pending"),
+                "tracking_url": state.get("tracking_url", "")}
+    finally:
+        driver.quit()
+
 if __name__ == "__main__":
     run_shopping_agent()
\ No newline at end of file
@@ -1,7 +1,8 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-from langchain_groq import ChatGroq
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from typing_extensions import TypedDict
 from pydantic import BaseModel, Field
@@ -10,13 +11,16 @@ from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import SystemMessage, HumanMessage
 import re
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.instrumentation import NodeTracer, track_llm
+from agent_common.routing import get_routed_chat_model
+
 # Load environment variables
-os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY1")
+load_dotenv()
+os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY1", "")
 
 # Use a supported Groq model
-llm = ChatGroq(model="llama3-70b-8192")
-result = llm.invoke("Hello, Furquan! How are you doing today?")
-print(result)
+llm = get_routed_chat_model("groq", "llama3-70b-8192", call_site="hitl_feedback")
 
 # Define Models
 class Analyst(BaseModel):
@@ -32,10 +36,15 @@ class Analyst(BaseModel):
 class Perspectives(BaseModel):
     analysts: List[Analyst] = Field(description="Comprehensive list of analysts with their roles and affiliations.")
 
+class Themes(BaseModel):
+    themes: List[str] = Field(description="One short theme per analyst slot.")
+
 class GenerateAnalystsState(TypedDict):
     topic: str  # Research topic
     max_analysts: int  # Number of analysts
     human_analyst_feedback: str  # Human feedback
+    generation_mode: str  # "single" (one call for all analysts) or "parallel" (one call per theme slot)
+    themes: List[str]  # Theme slot per analyst, parallel mode only
     analysts: List[Analyst]  # Analyst asking questions
 
 
@@ -55,21 +64,119 @@ analyst_instructions = """You are tasked with creating a set of AI analyst perso
 
 5. Assign one analyst to each theme."""
 
+# Theme slot instructions, used by the parallel mode
+theme_instructions = """You are planning a set of AI analyst personas. Follow these instructions carefully:
+
+1. First, review the research topic:
+{topic}
+
+2. Examine any editorial feedback that has been optionally provided to guide creation of the analysts: 
+{human_analyst_feedback}
+
+3. Determine the most interesting themes based upon documents and / or feedback above.
+
+4. Pick the top {max_analysts} themes and describe each in a short phrase."""
+
+# Single analyst instructions, one call per theme slot
+single_analyst_instructions = """You are tasked with creating one AI analyst persona. Follow these instructions carefully:
+
+1. First, review the research topic:
+{topic}
+
+2. The analyst must focus on this theme:
+{theme}
+
+3. Other analysts already cover these themes, so avoid overlapping with them:
+{other_themes}
+
+4. Examine any editorial feedback that has been optionally provided about this analyst:
+{human_analyst_feedback}
+
+5. Create one analyst for the theme."""
+
+# Matches "analyst 2", "persona #3" or "#1" in feedback
+ANALYST_NUMBER = re.compile(r"(?:\banalyst|\bpersona|#)\s*#?\s*(\d+)\b", re.IGNORECASE)
+
+def structured_invoke(schema, system_message: str, instruction: str):
+    """One structured-output call through the shared llm; returns the parsed schema and the raw message."""
+    output = llm.with_structured_output(schema, include_raw=True).invoke(
+        [SystemMessage(content=system_message)] + [HumanMessage(content=instruction)]
+    )
+    if output["parsed"] is None:
+        raise output["parsing_error"] or ValueError(f"No {schema.__name__} returned.")
+    return output["parsed"], output["raw"]
+
+def targeted_analysts(feedback: str, analysts: List[Analyst]) -> List[int]:
+    """Indexes of the analysts the feedback refers to, by full name, surname or number."""
+    lowered = feedback.lower()
+    targets = set()
+    for index, analyst in enumerate(analysts):
+        surname = analyst.name.split()[-1].lower() if analyst.name.split() else ""
+        if analyst.name.lower() in lowered or (len(surname) > 2 and re.search(rf"\b{re.escape(surname)}\b", lowered)):
+            targets.add(index)
+    for match in ANALYST_NUMBER.finditer(feedback):
+        if 1 <= int(match.group(1)) <= len(analysts):
+            targets.add(int(match.group(1)) - 1)
+    return sorted(targets)
+
+def generate_analysts_parallel(topic: str, themes: List[str], slots: List[int], feedback: str):
+    """Generate one Analyst per slot concurrently; returns the analysts and raw messages in slot order."""
+    def generate(slot):
+        system_message = single_analyst_instructions.format(
+            topic=topic,
+            theme=themes[slot],
+            other_themes="\n".join(t for i, t in enumerate(themes) if i != slot) or "None",
+            human_analyst_feedback=feedback,
+        )
+        return structured_invoke(Analyst, system_message, "Generate the analyst.")
+
+    with ThreadPoolExecutor(max_workers=max(1, len(slots))) as pool:
+        return list(pool.map(generate, slots))
+
 # Node Functions
-def create_analysts(state: GenerateAnalystsState):
+def create_analysts_single(state: GenerateAnalystsState):
     topic = state['topic']
     max_analysts = state['max_analysts']
     human_analyst_feedback = state.get('human_analyst_feedback', '')
     
-    structured_llm = llm.with_structured_output(Perspectives)
     system_message = analyst_instructions.format(topic=topic, human_analyst_feedback=human_analyst_feedback, max_analysts=max_analysts)
-    
+    perspectives, raw = structured_invoke(Perspectives, system_message, "Generate the set of analysts.")
+    track_llm(raw)
+    return {"analysts": perspectives.analysts}
+
+def create_analysts_parallel(state: GenerateAnalystsState):
+    topic = state['topic']
+    max_analysts = state['max_analysts']
+    human_analyst_feedback = state.get('human_analyst_feedback') or ''
+    analysts = list(state.get('analysts') or [])
+    themes = list(state.get('themes') or [])
+
+    # Feedback naming specific analysts only regenerates those; the rest come from the checkpoint
+    slots = []
+    if human_analyst_feedback.strip() and themes and len(analysts) == len(themes):
+        slots = targeted_analysts(human_analyst_feedback, analysts)
+    if not slots:
+        system_message = theme_instructions.format(topic=topic, human_analyst_feedback=human_analyst_feedback, max_analysts=max_analysts)
+        plan, raw = structured_invoke(Themes, system_message, "Generate the themes.")
+        track_llm(raw)
+        themes = plan.themes[:max_analysts]
+        analysts = [None] * len(themes)
+        slots = list(range(len(themes)))
+
+    # Token usage is recorded here, since node counters do not follow the worker threads
+    for slot, (analyst, raw) in zip(slots, generate_analysts_parallel(topic, themes, slots, human_analyst_feedback)):
+        track_llm(raw)
+        analysts[slot] = analyst
+    return {"themes": themes, "analysts": analysts}
+
+def create_analysts(state: GenerateAnalystsState):
     try:
-        analysts = structured_llm.invoke([SystemMessage(content=system_message)] + [HumanMessage(content="Generate the set of analysts.")])
-        return {"analysts": analysts.analysts}
+        if state.get('generation_mode', 'single') == 'parallel':
+            return create_analysts_parallel(state)
+        return create_analysts_single(state)
     except Exception as e:
         st.error(f"Error generating analysts: {str(e)}")
-        return {"analysts": []}
+        return {"analysts": state.get('analysts') or []}
 
 def human_feedback(state: GenerateAnalystsState):
     st.session_state.feedback = st.text_area("Provide feedback for the analysts (leave blank to finish):", key="feedback_input")
@@ -77,14 +184,15 @@ def human_feedback(state: GenerateAnalystsState):
 
 def should_continue(state: GenerateAnalystsState):
     human_analyst_feedback = state.get('human_analyst_feedback', None)
-    if st.session_state.get('feedback', '').strip():
+    if (human_analyst_feedback or '').strip():
         return "create_analysts"
     return END
 
 # Build Graph
+tracer = NodeTracer("hitl_feedback")
 builder = StateGraph(GenerateAnalystsState)
-builder.add_node("create_analysts", create_analysts)
-builder.add_node("human_feedback", human_feedback)
+builder.add_node("create_analysts", tracer.wrap("create_analysts", create_analysts))
+builder.add_node("human_feedback", tracer.wrap("human_feedback", human_feedback))
 builder.add_edge(START, "create_analysts")
 builder.add_edge("create_analysts", "human_feedback")
 builder.add_conditional_edges("human_feedback", should_continue, ["create_analysts", END])
@@ -92,44 +200,63 @@ builder.add_conditional_edges("human_feedback", should_continue, ["create_analys
 memory = MemorySaver()
 graph = builder.compile(interrupt_before=['human_feedback'], checkpointer=memory)
 
+def show_analysts(analysts: List[Analyst]):
+    for index, analyst in enumerate(analysts, start=1):
+        st.markdown(f"### {index}. {analyst.name}")
+        st.text(analyst.persona)
+
 # Streamlit Interface
-st.title("AI Analyst Persona Generator")
-st.write("Generate analyst personas for a research topic with optional human feedback.")
-
-with st.form("input_form"):
-    topic = st.text_input("Enter the research topic:", value="The benefits of adopting Robotics in Physical AI framework")
-    max_analysts = st.number_input("Number of analysts (max 5):", min_value=1, max_value=5, value=3)
-    submitted = st.form_submit_button("Generate Analysts")
-
-if submitted:
-    thread = {"configurable": {"thread_id": str(hash(st.session_state.get("session_id", 0)))}}
-    st.session_state.session_id = st.session_state.get("session_id", 0) + 1
-
-    with st.spinner("Generating analysts..."):
-        for event in graph.stream({"topic": topic, "max_analysts": max_analysts}, thread, stream_mode="values"):
-            analysts = event.get("analysts", [])
-            if analysts:
-                st.subheader("Generated Analysts")
-                for analyst in analysts:
-                    st.markdown(f"### {analyst.name}")
-                    st.text(analyst.persona)
-                st.session_state.analysts = analysts
-
-    if st.session_state.get("analysts"):
+def main():
+    st.title("AI Analyst Persona Generator")
+    st.write("Generate analyst personas for a research topic with optional human feedback.")
+
+    with st.form("input_form"):
+        topic = st.text_input("Enter the research topic:", value="The benefits of adopting Robotics in Physical AI framework")
+        max_analysts = st.number_input("Number of analysts (max 5):", min_value=1, max_value=5, value=3)
+        parallel = st.checkbox("Generate analysts in parallel (feedback naming an analyst regenerates only that one)", value=True)
+        submitted = st.form_submit_button("Generate Analysts")
+
+    if submitted:
+        # Keep the thread across reruns so feedback resumes the same checkpoint
+        st.session_state.session_id = st.session_state.get("session_id", 0) + 1
+        st.session_state.thread = {"configurable": {"thread_id": str(hash(st.session_state.session_id))}}
+        st.session_state.finalized = False
+
+        initial_state = {"topic": topic, "max_analysts": max_analysts,
+                         "generation_mode": "parallel" if parallel else "single"}
+        with st.spinner("Generating analysts..."):
+            for event in graph.stream(initial_state, st.session_state.thread, stream_mode="values"):
+                if event.get("analysts"):
+                    st.session_state.analysts = event["analysts"]
+
+    thread = st.session_state.get("thread")
+    if thread and st.session_state.get("analysts") and not st.session_state.get("finalized"):
+        st.subheader("Generated Analysts")
+        show_analysts(st.session_state.analysts)
+
         with st.expander("Provide Feedback or Continue"):
-            if st.button("Continue with Feedback"):
-                feedback = st.session_state.feedback
+            feedback = st.text_area("Feedback (e.g. \"make analyst 2 a regulator\"):", key="feedback_input")
+            if st.button("Continue with Feedback") and feedback.strip():
                 graph.update_state(thread, {"human_analyst_feedback": feedback}, as_node="human_feedback")
+                with st.spinner("Regenerating analysts..."):
+                    for event in graph.stream(None, thread, stream_mode="values"):
+                        if event.get("analysts"):
+                            st.session_state.analysts = event["analysts"]
                 st.experimental_rerun()
 
         if st.button("Finalize"):
+            graph.update_state(thread, {"human_analyst_feedback": ""}, as_node="human_feedback")
+            for _ in graph.stream(None, thread, stream_mode="values"):
+                pass
             final_state = graph.get_state(thread)
             st.session_state.analysts = final_state.values.get('analysts', [])
+            st.session_state.finalized = True
             st.success("Analyst generation finalized!")
             st.experimental_rerun()
 
-if st.session_state.get("analysts"):
-    st.subheader("Final Analyst Personas")
-    for analyst in st.session_state.analysts:
-        st.markdown(f"### {analyst.name}")
-        st.text(analyst.persona)
\ No newline at end of file
+    if st.session_state.get("analysts") and st.session_state.get("finalized"):
+        st.subheader("Final Analyst Personas")
+        show_analysts(st.session_state.analysts)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
+import sys
 import google.generativeai as genai
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import google.api_core.exceptions
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_common.clients import get_gemini_model
+from agent_common.instrumentation import NodeTracer, track_call, track_llm
+from agent_common.remote import JobFailed, run, server_url
+
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("GOOGLE_API_KEY")
@@ -33,13 +39,18 @@ def extract_video_id(youtube_video_url):
         st.error(f"Error parsing URL: {str(e)}")
         return None
 
+# This agent has no LangGraph graph, so its two stages are traced directly
+tracer = NodeTracer("youtube_summarizer")
+
 # Function to extract transcript
+@tracer.wrap("transcript")
 def extract_transcript_details(youtube_video_url):
     try:
         video_id = extract_video_id(youtube_video_url)
         if not video_id:
             return None
         transcript_text = YouTubeTranscriptApi.get_transcript(video_id)
+        track_call("youtube")
         transcript = " ".join([i["text"] for i in transcript_text])
         # Truncate transcript to reduce token usage
         transcript = transcript[:10000]  # Limit to ~10,000 characters
@@ -49,6 +60,7 @@ def extract_transcript_details(youtube_video_url):
         return None
 
 # Function to generate summary using Gemini with retry logic
+@tracer.wrap("summarize")
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=30),
@@ -57,8 +69,8 @@ def extract_transcript_details(youtube_video_url):
 def generate_gemini_content(transcript_text, prompt):
     try:
         # Use gemini-1.5-flash for higher quota limits
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt + transcript_text)
+        model = get_gemini_model("gemini-1.5-flash")
+        response = track_llm(model.generate_content(prompt + transcript_text))
         return response.text
     except google.api_core.exceptions.ResourceExhausted as e:
         st.warning(f"Quota exceeded: {str(e)}. Retrying...")
@@ -68,28 +80,42 @@ def generate_gemini_content(transcript_text, prompt):
         return None
 
 # Streamlit UI
-st.title("YouTube Transcript to Detailed Notes Converter")
-youtube_link = st.text_input("Enter YouTube Video Link:")
+def main():
+    st.title("YouTube Transcript to Detailed Notes Converter")
+    youtube_link = st.text_input("Enter YouTube Video Link:")
 
-if youtube_link:
-    video_id = extract_video_id(youtube_link)
-    if video_id:
-        st.image(f"http://img.youtube.com/vi/{video_id}/0.jpg",  use_container_width=True)
-    else:
-        st.warning("Please enter a valid YouTube URL.")
-
-if st.button("Get Detailed Notes"):
     if youtube_link:
-        with st.spinner("Fetching transcript and generating summary..."):
-            transcript_text = extract_transcript_details(youtube_link)
-            if transcript_text:
-                summary = generate_gemini_content(transcript_text, prompt)
-                if summary:
+        video_id = extract_video_id(youtube_link)
+        if video_id:
+            st.image(f"http://img.youtube.com/vi/{video_id}/0.jpg",  use_container_width=True)
+        else:
+            st.warning("Please enter a valid YouTube URL.")
+
+    if st.button("Get Detailed Notes"):
+        if youtube_link:
+            with st.spinner("Fetching transcript and generating summary..."):
+                if server_url():
+                    # The job server fetches the transcript and summarizes it
+                    try:
+                        summary = run("youtube_summarizer", {"youtube_url": youtube_link})["summary"]
+                    except JobFailed as e:
+                        st.error(str(e))
+                        return
                     st.markdown("## Detailed Notes:")
                     st.write(summary)
+                    return
+                transcript_text = extract_transcript_details(youtube_link)
+                if transcript_text:
+                    summary = generate_gemini_content(transcript_text, prompt)
+                    if summary:
+                        st.markdown("## Detailed Notes:")
+                        st.write(summary)
+                    else:
+                        st.error("Failed to generate summary.")
                 else:
-                    st.error("Failed to generate summary.")
-            else:
-                st.error("Failed to fetch transcript.")
-    else:
-        st.warning("Please enter a YouTube video link.")
\ No newline at end of file
+                    st.error("Failed to fetch transcript.")
+        else:
+            st.warning("Please enter a YouTube video link.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
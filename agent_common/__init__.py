@@ -0,0 +1 @@
+"""Shared helpers used by the agent folders (instrumentation, tooling)."""
@@ -0,0 +1,40 @@
+"""Locate and import the agent scripts by name.
+
+The agent folders start with a digit and contain hyphens, so they cannot be
+imported as packages. load_agent() imports a script from its file path
+without running its Streamlit main().
+"""
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AGENTS = {
+    "document_extractor": "1-DocumentExtractor/documentextractoragent.py",
+    "summarizer": "2-Summarizer/summaryagent.py",
+    "blog_generator": "3-BlogGenerator/bloggenerator.py",
+    "image_recognition": "4-ImageRecognition/imagerecognition_animal.py",
+    "orchestrator_synthesizer": "5-OrchestorSynthesizer/orches_synthesizer.py",
+    "add_to_cart": "6-Addtocart/addtocart.py",
+    "hitl_feedback": "7-HITLFeedback/personalassistant_human.py",
+    "youtube_summarizer": "8-YoutubeSummarizer/yttranscriber.py",
+}
+
+
+def load_agent(name: str):
+    """Import the agent script registered under name, once per process."""
+    if name not in AGENTS:
+        raise KeyError(f"Unknown agent '{name}'. Choose from: {', '.join(AGENTS)}")
+    module_name = f"agent_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_ROOT, AGENTS[name]))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
@@ -0,0 +1,203 @@
+"""Headless batch runner for the Summarizer and DocumentExtractor graphs.
+
+Files from a directory or glob are fed through a work queue to a pool of
+worker processes, each of which imports the agent once and runs its
+compiled `app`. Results stream to a JSONL file that doubles as the
+checkpoint: re-running the same command skips files already processed
+successfully, so an interrupted batch resumes where it stopped.
+
+Usage:
+    python -m agent_common.batch summarizer reports/ --output summaries.jsonl
+    python -m agent_common.batch document_extractor "scans/**/*.pdf" --workers 8
+    python -m agent_common.batch summarizer notes/ --pattern "*.md"
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common.agents import load_agent
+from agent_common.instrumentation import collect_node_metrics
+
+
+def _summarizer_state(path: str) -> dict:
+    # .txt/.md files are streamed in chunks rather than loaded whole
+    input_type = "text_file" if path.lower().endswith((".txt", ".md")) else "pdf_path"
+    return {"input_type": input_type, "input_path": path, "text_content": [], "summary": ""}
+
+
+# The agents' extract nodes report failures with st.error and carry on with
+# empty or placeholder text; in batch mode that has to count as a failed file
+# so the checkpoint retries it.
+EXTRACTION_FAILED = ["No text extracted"]
+
+
+def _summarizer_result(state: dict) -> dict:
+    if state["text_content"] == EXTRACTION_FAILED:
+        raise ValueError("No text extracted")
+    if state.get("input_type") == "text_file":
+        if not state.get("chunks"):
+            raise ValueError("No text to summarize")
+        return {"summary": state["summary"], "chunks": state["chunks"]}
+    if not state["text_content"]:
+        raise ValueError("PDF has no pages")
+    return {"summary": state["summary"], "pages": len(state["text_content"])}
+
+
+def _document_extractor_state(path: str) -> dict:
+    return {"input_type": "pdf_path", "pdf_path": path, "text_content": [], "image_content": [], "image_count": 0, "scanned_pages": [], "ocr_results": [], "reasoning_output": []}
+
+
+def _document_extractor_result(state: dict) -> dict:
+    if not state["text_content"] and not state.get("scanned_pages"):
+        raise ValueError("No pages extracted")
+    return {
+        "analysis": "\n".join(state["reasoning_output"]),
+        # Scanned pages are OCR'd instead of landing in text_content
+        "pages": len(state["text_content"]) + len(state.get("scanned_pages", [])),
+        "text_pages": len(state["text_content"]),
+        "ocr_pages": sorted({item["page"] for item in state.get("ocr_results", [])}),
+    }
+
+
+# agent -> (initial state builder, result extractor, default file pattern)
+BATCH_AGENTS = {
+    "summarizer": (_summarizer_state, _summarizer_result, "*.pdf"),
+    "document_extractor": (_document_extractor_state, _document_extractor_result, "*.pdf"),
+}
+
+_worker_agent = None
+_worker_module = None
+
+
+def ocr_workers_per_process(workers: int) -> int:
+    """OCR threads per batch worker: OCR_WORKERS if set, else an even share of the CPUs.
+
+    Each OCR thread drives its own tesseract process, so letting every batch
+    worker default to cpu_count() threads would run about cpu_count()**2 of them.
+    """
+    if os.getenv("OCR_WORKERS"):
+        return int(os.environ["OCR_WORKERS"])
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(agent: str, ocr_workers: int):
+    global _worker_agent, _worker_module
+    _worker_agent = agent
+    # Read by the DocumentExtractor at import time
+    os.environ["OCR_WORKERS"] = str(ocr_workers)
+    _worker_module = load_agent(agent)
+
+
+def _process_file(path: str) -> dict:
+    build_state, extract_result, _ = BATCH_AGENTS[_worker_agent]
+    start = time.perf_counter()
+    with collect_node_metrics() as records:
+        try:
+            state = _worker_module.app.invoke(build_state(path))
+            record = {"file": path, "status": "ok", "result": extract_result(state)}
+        except Exception as e:
+            record = {"file": path, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    record["elapsed_s"] = round(time.perf_counter() - start, 3)
+    record["stages"] = {r["node"]: r["wall_time_s"] for r in records}
+    return record
+
+
+def find_files(inputs, pattern: str) -> list:
+    """Expand directories (searched recursively for pattern) and globs into sorted file paths."""
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            files.update(glob.glob(os.path.join(item, "**", pattern), recursive=True))
+        else:
+            files.update(glob.glob(item, recursive=True))
+    return sorted(os.path.abspath(f) for f in files if os.path.isfile(f))
+
+
+def load_checkpoint(output: str) -> set:
+    """Return the files already processed successfully in a previous run."""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial last line from an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["file"])
+    return done
+
+
+def run_batch(agent: str, files: list, output: str, workers: int, max_tasks_per_child: int = None,
+              ocr_workers: int = None) -> dict:
+    """Process files with a worker pool, appending one JSONL record per file."""
+    ocr_workers = ocr_workers or ocr_workers_per_process(workers)
+    done = load_checkpoint(output)
+    pending = [f for f in files if f not in done]
+    print(f"{len(files)} files found, {len(files) - len(pending)} already done, {len(pending)} to process",
+          file=sys.stderr)
+
+    stage_totals = defaultdict(float)
+    processed = errors = 0
+    start = time.perf_counter()
+    with open(output, "a", encoding="utf-8") as out, \
+            multiprocessing.Pool(workers, _init_worker, (agent, ocr_workers), maxtasksperchild=max_tasks_per_child) as pool:
+        try:
+            for record in pool.imap_unordered(_process_file, pending):
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+                processed += 1
+                errors += record["status"] != "ok"
+                for stage, seconds in record["stages"].items():
+                    stage_totals[stage] += seconds
+                if processed % 10 == 0 or processed == len(pending):
+                    rate = processed / (time.perf_counter() - start) * 60
+                    print(f"  {processed}/{len(pending)} files, {rate:.1f} files/min, {errors} errors", file=sys.stderr)
+        except KeyboardInterrupt:
+            pool.terminate()
+            print(f"Interrupted after {processed} files; re-run the same command to resume.", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "processed": processed,
+        "errors": errors,
+        "skipped": len(files) - len(pending),
+        "elapsed_s": round(elapsed, 3),
+        "files_per_minute": round(processed / elapsed * 60, 2) if elapsed else 0.0,
+        "stage_seconds": {stage: round(total, 3) for stage, total in stage_totals.items()},
+        "stage_mean_seconds": {stage: round(total / processed, 3) for stage, total in stage_totals.items()} if processed else {},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agent", choices=list(BATCH_AGENTS))
+    parser.add_argument("inputs", nargs="+", help="Directories or glob patterns")
+    parser.add_argument("--pattern", help="File pattern used inside directories (default: *.pdf)")
+    parser.add_argument("--output", "-o", help="Results JSONL, also the resume checkpoint (default: <agent>_results.jsonl)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-tasks-per-child", type=int, default=None,
+                        help="Recycle worker processes after this many files to bound memory growth")
+    parser.add_argument("--ocr-workers", type=int, default=None,
+                        help="OCR threads per worker process (default: OCR_WORKERS, else CPUs / --workers)")
+    args = parser.parse_args(argv)
+
+    files = find_files(args.inputs, args.pattern or BATCH_AGENTS[args.agent][2])
+    if not files:
+        parser.error("no input files found")
+    report = run_batch(args.agent, files, args.output or f"{args.agent}_results.jsonl",
+                       args.workers, args.max_tasks_per_child, args.ocr_workers)
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
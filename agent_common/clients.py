@@ -0,0 +1,127 @@
+"""Shared, long-lived LLM clients with keep-alive connection pools.
+
+Building a ChatOpenAI, ChatGroq or OpenAI client per call (or per Streamlit
+rerun) opens fresh HTTP connections and repeats the TLS handshake every
+time. The getters here return one client per provider, model and settings,
+created on first use and reused afterwards. Each provider gets its own
+httpx connection pool. The registry lives at module level, so every
+Streamlit session in the process shares it. httpx clients and the
+LangChain chat models are safe to call from multiple threads.
+
+Environment variables:
+    LLM_POOL_MAX_CONNECTIONS  Connections per provider (default: 20)
+    LLM_POOL_MAX_KEEPALIVE    Idle connections kept open (default: 10)
+    LLM_KEEPALIVE_EXPIRY_S    Seconds an idle connection is kept (default: 60)
+    LLM_TIMEOUT_S             Read/write timeout per request (default: 60)
+    LLM_CONNECT_TIMEOUT_S     Connect timeout (default: 10)
+"""
+import os
+import threading
+
+_lock = threading.Lock()
+_http_clients = {}
+_clients = {}
+
+
+def _pool_settings() -> dict:
+    return {
+        "max_connections": int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+        "max_keepalive": int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10")),
+        "keepalive_expiry": float(os.getenv("LLM_KEEPALIVE_EXPIRY_S", "60")),
+        "timeout": float(os.getenv("LLM_TIMEOUT_S", "60")),
+        "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT_S", "10")),
+    }
+
+
+def _timeout():
+    import httpx
+
+    settings = _pool_settings()
+    return httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"])
+
+
+def get_http_client(provider: str):
+    """Return the keep-alive httpx.Client shared by every client of provider."""
+    with _lock:
+        if provider not in _http_clients:
+            import httpx
+
+            settings = _pool_settings()
+            _http_clients[provider] = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings["max_connections"],
+                    max_keepalive_connections=settings["max_keepalive"],
+                    keepalive_expiry=settings["keepalive_expiry"],
+                ),
+                timeout=_timeout(),
+            )
+        return _http_clients[provider]
+
+
+def get_or_create(key, factory):
+    """Return the shared object cached under key, building it with factory() on first use."""
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+    client = factory()
+    with _lock:
+        # Another session may have built the same client meanwhile; keep the first
+        return _clients.setdefault(key, client)
+
+
+def get_chat_model(provider: str, model: str, **kwargs):
+    """Return a shared LangChain chat model ("openai" or "groq") for model.
+
+    Extra keyword arguments (temperature, base_url, api_key, ...) are passed
+    to the constructor and are part of the cache key.
+    """
+    key = ("chat", provider, model, tuple(sorted(kwargs.items())))
+
+    def factory():
+        if provider == "openai":
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(model=model, http_client=get_http_client(provider), timeout=_timeout(), **kwargs)
+        if provider == "groq":
+            from langchain_groq import ChatGroq
+
+            return ChatGroq(model=model, http_client=get_http_client(provider), timeout=_timeout(), **kwargs)
+        raise ValueError(f"Unsupported chat provider '{provider}'")
+
+    return get_or_create(key, factory)
+
+
+def get_openai_client(**kwargs):
+    """Return a shared openai.OpenAI client."""
+    key = ("openai_sdk", tuple(sorted(kwargs.items())))
+
+    def factory():
+        from openai import OpenAI
+
+        return OpenAI(http_client=get_http_client("openai"), timeout=_timeout(), **kwargs)
+
+    return get_or_create(key, factory)
+
+
+def get_gemini_model(model: str):
+    """Return a shared google.generativeai GenerativeModel.
+
+    The Gemini SDK keeps its own process-wide transport; reusing the model
+    object avoids rebuilding it and its request settings per call.
+    """
+    def factory():
+        import google.generativeai as genai
+
+        return genai.GenerativeModel(model)
+
+    return get_or_create(("gemini", model), factory)
+
+
+def close_clients():
+    """Close every pooled connection and forget the cached clients."""
+    with _lock:
+        for http_client in _http_clients.values():
+            http_client.close()
+        _http_clients.clear()
+        _clients.clear()
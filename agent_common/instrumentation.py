@@ -0,0 +1,304 @@
+"""Per-node instrumentation for the LangGraph agents.
+
+Wrap a node with NodeTracer.wrap() and every run records wall time, LLM
+calls and tokens, external calls, cache hits and peak traced memory.
+Records are appended to a local JSONL file and, when AGENT_METRICS_PORT
+is set, also exposed in Prometheus text format on /metrics.
+
+Environment variables:
+    AGENT_METRICS_PATH         JSONL sink (default: agent_metrics.jsonl)
+    AGENT_METRICS_PORT         Port for the Prometheus endpoint (off if unset)
+    AGENT_METRICS_HOST         Interface for the Prometheus endpoint (default: 127.0.0.1)
+    AGENT_METRICS_TRACEMALLOC  Set to 1 to record peak memory (off by default;
+                               tracemalloc slows every allocation while on)
+    AGENT_METRICS_DISABLED     Set to 1 to turn instrumentation off
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_current_node = contextvars.ContextVar("agent_current_node", default=None)
+_collector = contextvars.ContextVar("agent_node_collector", default=None)
+
+# tracemalloc's peak is process-wide, so it is only reset when no other traced
+# node is running; _overlaps counts starts that found one, so a node can tell
+# whether its peak was shared.
+_trace_lock = threading.Lock()
+_traced_in_flight = 0
+_overlaps = 0
+_started_tracing = False
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() not in ("0", "false", "no", "")
+
+
+class NodeCounters:
+    """Counters filled in by track_* calls while a node is running."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_hits = 0
+        self.external_calls = defaultdict(int)
+
+    def add_llm(self, input_tokens: int, output_tokens: int):
+        with self._lock:
+            self.llm_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def add_call(self, kind: str, count: int):
+        with self._lock:
+            self.external_calls[kind] += count
+
+    def add_cache_hit(self, count: int):
+        with self._lock:
+            self.cache_hits += count
+
+
+class MetricsSink:
+    """Appends node records to a JSONL file and keeps Prometheus aggregates."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(float))
+        self._calls = defaultdict(float)
+
+    def write(self, record: dict):
+        line = json.dumps(record, default=str)
+        key = (record["agent"], record["node"])
+        with self._lock:
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            totals = self._totals[key]
+            totals["runs"] += 1
+            totals["errors"] += record["status"] != "ok"
+            totals["seconds"] += record["wall_time_s"]
+            totals["llm_calls"] += record["llm_calls"]
+            totals["input_tokens"] += record["input_tokens"]
+            totals["output_tokens"] += record["output_tokens"]
+            totals["cache_hits"] += record["cache_hits"]
+            totals["peak_memory_bytes"] = max(totals["peak_memory_bytes"], record["peak_memory_bytes"] or 0)
+            for kind, count in record["external_calls"].items():
+                self._calls[key + (kind,)] += count
+
+    def render_prometheus(self) -> str:
+        metrics = [
+            ("agent_node_runs_total", "counter", "Node executions.", "runs"),
+            ("agent_node_errors_total", "counter", "Node executions that raised.", "errors"),
+            ("agent_node_duration_seconds_total", "counter", "Wall time spent in the node.", "seconds"),
+            ("agent_node_llm_calls_total", "counter", "LLM calls made by the node.", "llm_calls"),
+            ("agent_node_input_tokens_total", "counter", "LLM input tokens.", "input_tokens"),
+            ("agent_node_output_tokens_total", "counter", "LLM output tokens.", "output_tokens"),
+            ("agent_node_cache_hits_total", "counter", "Cache hits inside the node.", "cache_hits"),
+            ("agent_node_peak_memory_bytes", "gauge", "Largest traced memory peak seen.", "peak_memory_bytes"),
+        ]
+        lines = []
+        with self._lock:
+            for name, kind, help_text, field in metrics:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for (agent, node), totals in sorted(self._totals.items()):
+                    lines.append(f'{name}{{agent="{agent}",node="{node}"}} {totals[field]:g}')
+            lines.append("# HELP agent_node_external_calls_total External calls (search, OCR, HTTP) by kind.")
+            lines.append("# TYPE agent_node_external_calls_total counter")
+            for (agent, node, kind), count in sorted(self._calls.items()):
+                lines.append(f'agent_node_external_calls_total{{agent="{agent}",node="{node}",kind="{kind}"}} {count:g}')
+        return "\n".join(lines) + "\n"
+
+
+_sink = None
+_sink_lock = threading.Lock()
+_server = None
+
+
+def get_sink() -> MetricsSink:
+    """Return the process-wide sink, starting the /metrics endpoint on first use."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = MetricsSink(os.getenv("AGENT_METRICS_PATH", "agent_metrics.jsonl"))
+            port = os.getenv("AGENT_METRICS_PORT")
+            if port:
+                start_metrics_server(int(port), os.getenv("AGENT_METRICS_HOST", "127.0.0.1"))
+        return _sink
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Serve the aggregated metrics in Prometheus text format (once per process)."""
+    global _server
+    if _server is not None:
+        return _server
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = get_sink().render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="agent-metrics", daemon=True).start()
+    return _server
+
+
+def _token_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict):  # LangChain AIMessage
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    if usage is not None:  # Gemini GenerateContentResponse
+        return getattr(usage, "prompt_token_count", 0) or 0, getattr(usage, "candidates_token_count", 0) or 0
+    usage = getattr(response, "usage", None)
+    if usage is not None:  # OpenAI ChatCompletion
+        return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+    return 0, 0
+
+
+def track_llm(response):
+    """Record one LLM call and its token usage; returns the response unchanged."""
+    counters = _current_node.get()
+    if counters is not None:
+        counters.add_llm(*_token_usage(response))
+    return response
+
+
+def track_call(kind: str, count: int = 1):
+    """Record calls to an external service such as search, OCR or a website."""
+    counters = _current_node.get()
+    if counters is not None:
+        counters.add_call(kind, count)
+
+
+def track_cache_hit(count: int = 1):
+    counters = _current_node.get()
+    if counters is not None:
+        counters.add_cache_hit(count)
+
+
+@contextlib.contextmanager
+def collect_node_metrics():
+    """Also capture the records of nodes run inside this block into a list.
+
+    Used by callers that need a per-invocation breakdown, e.g.:
+
+        with collect_node_metrics() as records:
+            app.invoke(state)
+        stage_times = {r["node"]: r["wall_time_s"] for r in records}
+    """
+    records = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+def _begin_trace():
+    """Count a traced node in; returns (alone, overlap count, baseline bytes) for _end_trace."""
+    global _traced_in_flight, _overlaps, _started_tracing
+    with _trace_lock:
+        alone = not _traced_in_flight
+        if not alone:
+            _overlaps += 1
+        else:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            tracemalloc.reset_peak()
+        _traced_in_flight += 1
+        return alone, _overlaps, tracemalloc.get_traced_memory()[0]
+
+
+def _end_trace(alone_at_start: bool, overlaps_at_start: int):
+    """Count a traced node out; returns (peak bytes, whether other nodes shared the peak)."""
+    global _traced_in_flight, _started_tracing
+    with _trace_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        shared = not alone_at_start or _overlaps != overlaps_at_start
+        _traced_in_flight -= 1
+        if not _traced_in_flight and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return peak, shared
+
+
+class NodeTracer:
+    """Wraps the nodes of one agent so each run is recorded to the sink.
+
+    Peak memory comes from tracemalloc, which is process-wide. A node that
+    ran while another traced node was running gets peak_memory_shared=True:
+    its peak may include the other node's allocations.
+    """
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.enabled = not _env_flag("AGENT_METRICS_DISABLED", "0")
+        self.trace_memory = _env_flag("AGENT_METRICS_TRACEMALLOC", "0")
+
+    def wrap(self, node: str, fn=None):
+        """Return fn wrapped for node; usable as a decorator when fn is omitted."""
+        if fn is None:
+            return lambda f: self.wrap(node, f)
+        if not self.enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            counters = NodeCounters()
+            token = _current_node.set(counters)
+            if self.trace_memory:
+                alone, overlaps, baseline = _begin_trace()
+            status = "ok"
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                status = "error"
+                raise
+            finally:
+                wall_time = time.perf_counter() - start
+                peak = shared = None
+                if self.trace_memory:
+                    peak, shared = _end_trace(alone, overlaps)
+                    peak -= baseline
+                _current_node.reset(token)
+                record = {
+                    "ts": time.time(),
+                    "agent": self.agent,
+                    "node": node,
+                    "status": status,
+                    "wall_time_s": round(wall_time, 6),
+                    "llm_calls": counters.llm_calls,
+                    "input_tokens": counters.input_tokens,
+                    "output_tokens": counters.output_tokens,
+                    "external_calls": dict(counters.external_calls),
+                    "cache_hits": counters.cache_hits,
+                    "peak_memory_bytes": max(peak, 0) if peak is not None else None,
+                    "peak_memory_shared": shared,
+                }
+                get_sink().write(record)
+                collector = _collector.get()
+                if collector is not None:
+                    collector.append(record)
+
+        return wrapper
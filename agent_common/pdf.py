@@ -0,0 +1,11 @@
+"""Process-wide lock for PyMuPDF.
+
+PyMuPDF is not thread-safe: two threads opening, reading or rendering
+documents at the same time can corrupt MuPDF's shared context or crash the
+process. The PDF agents hold FITZ_LOCK around every fitz call, so several
+jobs can run on agent_common.serving's worker threads while only one of
+them touches fitz at a time. Their LLM and OCR work still runs in parallel.
+"""
+import threading
+
+FITZ_LOCK = threading.RLock()
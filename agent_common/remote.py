@@ -0,0 +1,97 @@
+"""Client for agent_common.serving, used by the Streamlit front-ends.
+
+When AGENT_SERVER_URL is set (e.g. http://127.0.0.1:8500), invoke() sends
+the initial state to the job server and long-polls for the result, so the
+Streamlit rerun only waits instead of running the graph itself. Without
+it, invoke() runs the local graph as before.
+"""
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+from agent_common.serving import from_jsonable, to_jsonable
+
+
+class ServerBusy(Exception):
+    """The server's queue for the agent is full; retry after retry_after_s."""
+
+    def __init__(self, retry_after_s: float):
+        super().__init__(f"Agent server busy, retry after {retry_after_s:.0f}s")
+        self.retry_after_s = retry_after_s
+
+
+class JobFailed(Exception):
+    """The job ran on the server and raised an error."""
+
+
+def server_url() -> str:
+    return os.getenv("AGENT_SERVER_URL", "").rstrip("/")
+
+
+def _request(method: str, url: str, body: dict = None, timeout: float = 60.0) -> dict:
+    data = json.dumps(to_jsonable(body)).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        if e.code == 429:
+            raise ServerBusy(float(e.headers.get("Retry-After") or 1)) from None
+        raise
+
+
+def upload(data: bytes, base_url: str = None) -> dict:
+    """Send a file to the server's upload spool as a raw body.
+
+    Returns {"__upload__": id} to put in a job's state in place of a path;
+    the server swaps in the spooled file's path. Unlike bytes in the JSON
+    body, the upload is neither base64-encoded nor held in server memory.
+    """
+    request = urllib.request.Request(f"{base_url or server_url()}/uploads", data=data, method="POST",
+                                     headers={"Content-Type": "application/octet-stream",
+                                              "Content-Length": str(len(data))})
+    with urllib.request.urlopen(request, timeout=300) as response:
+        return {"__upload__": json.loads(response.read())["upload_id"]}
+
+
+def submit(agent: str, state: dict, base_url: str = None) -> str:
+    """Queue a job and return its id. Raises ServerBusy when the queue is full."""
+    return _request("POST", f"{base_url or server_url()}/agents/{agent}/jobs", state)["job_id"]
+
+
+def wait(job_id: str, timeout: float = 600.0, base_url: str = None) -> dict:
+    """Long-poll until the job finishes and return its decoded result."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Job {job_id} did not finish within {timeout:.0f}s")
+        poll_s = min(remaining, 25.0)
+        job = _request("GET", f"{base_url or server_url()}/jobs/{job_id}?wait={poll_s:.1f}", timeout=poll_s + 10)
+        if job["status"] == "done":
+            return from_jsonable(job["result"])
+        if job["status"] == "error":
+            raise JobFailed(job["error"])
+
+
+def run(agent: str, state: dict, timeout: float = 600.0, base_url: str = None) -> dict:
+    """Submit a job and wait for its result, backing off while the server is busy."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            job_id = submit(agent, state, base_url)
+            break
+        except ServerBusy as e:
+            if time.monotonic() + e.retry_after_s > deadline:
+                raise
+            time.sleep(e.retry_after_s)
+    return wait(job_id, max(1.0, deadline - time.monotonic()), base_url)
+
+
+def invoke(agent: str, app, state: dict) -> dict:
+    """Run state through the job server if AGENT_SERVER_URL is set, else through the local app."""
+    if server_url():
+        return run(agent, state)
+    return app.invoke(state)
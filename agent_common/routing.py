@@ -0,0 +1,240 @@
+"""Hedged and fallback LLM requests across providers.
+
+HedgedRouter has the same invoke() / with_structured_output() interface as a
+LangChain chat model, so it can replace `llm` at the existing call sites.
+A request goes to the preferred provider first. If no answer has come back
+after that provider's recent p95 latency, a duplicate goes to the next
+provider and whichever finishes first wins. Errors fail over to the next
+provider at once. Error rates are kept per provider and shared by every
+router in the process; they move unhealthy providers to the back of the
+queue. Errors caused by the request itself (4xx such as a prompt over the
+model's context window) count against that provider at the failing call
+site only, so long-document call sites cannot demote a small-context model
+for the short prompts it serves well. Latency is kept per call site as well as provider, since a 12k-
+character summary and a one-line chat reply have very different p95s, and
+it sets the hedge delay. No hedge is sent while the shared executor is
+saturated, because queue time there is not provider slowness.
+
+Environment variables:
+    LLM_FALLBACKS               provider:model list tried after the primary
+                                (default: groq:llama3-70b-8192,openai:gpt-4o-mini)
+    LLM_HEDGING                 Set to 0 for failover only (default: 1)
+    LLM_HEDGE_DEFAULT_DELAY_S   Hedge delay before enough samples exist (default: 3)
+    LLM_HEDGE_MIN_DELAY_S       Lower bound on the hedge delay (default: 0.5)
+    LLM_ROUTER_WORKERS          Threads for in-flight provider calls (default: 32)
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from agent_common.clients import get_chat_model, get_or_create
+
+# Environment variable that must be set for a provider to be used as a fallback
+PROVIDER_KEYS = {"openai": "OPENAI_API_KEY", "groq": "GROQ_API_KEY"}
+
+
+class LatencyStats:
+    """Rolling window of recent call latencies and outcomes for one provider."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            if ok:
+                self._latencies.append(seconds)
+            self._outcomes.append(ok)
+
+    def percentile(self, pct: float):
+        with self._lock:
+            ordered = sorted(self._latencies)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    @property
+    def samples(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            recent = list(self._outcomes)[-20:]
+        return recent.count(False) / len(recent) if recent else 0.0
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+_executor_workers = int(os.getenv("LLM_ROUTER_WORKERS", "32"))
+_executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix="llm-router")
+_in_flight = 0  # Provider calls submitted to _executor and not yet finished
+_in_flight_lock = threading.Lock()
+
+
+def is_request_error(error: Exception) -> bool:
+    """True when the request itself was rejected (e.g. too long for the model), not the provider."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return True
+    message = str(error).lower()
+    return "context_length" in message or "context length" in message
+
+
+def get_stats(name: str, call_site: str = None) -> LatencyStats:
+    """Return the process-wide statistics for provider name, or for it at one call site."""
+    with _stats_lock:
+        return _stats.setdefault((call_site, name), LatencyStats())
+
+
+def executor_saturated() -> bool:
+    """True when every router thread is busy, so new calls would queue."""
+    with _in_flight_lock:
+        return _in_flight >= _executor_workers
+
+
+class HedgedRouter:
+    """Routes invoke() calls across (name, llm) providers listed in preference order.
+
+    call_site names the kind of request (e.g. "summarizer.chunks") so its
+    hedge delay is learnt from comparable calls only.
+    """
+
+    def __init__(self, providers, hedging: bool = None, default_delay_s: float = None,
+                 min_delay_s: float = None, min_samples: int = 20, hedge_percentile: float = 95,
+                 call_site: str = "default"):
+        if not providers:
+            raise ValueError("HedgedRouter needs at least one provider")
+        self.providers = list(providers)
+        self.call_site = call_site
+        self.hedging = os.getenv("LLM_HEDGING", "1") != "0" if hedging is None else hedging
+        self.default_delay_s = default_delay_s if default_delay_s is not None else float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_S", "3"))
+        self.min_delay_s = min_delay_s if min_delay_s is not None else float(os.getenv("LLM_HEDGE_MIN_DELAY_S", "0.5"))
+        self.min_samples = min_samples
+        self.hedge_percentile = hedge_percentile
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def hedge_delay(self, name: str) -> float:
+        stats = get_stats(name, self.call_site)
+        if stats.samples < self.min_samples:
+            return self.default_delay_s
+        return max(self.min_delay_s, stats.percentile(self.hedge_percentile))
+
+    def ranked(self) -> list:
+        """Providers in preference order, with ones unhealthy overall or at this call site moved to the back."""
+        return sorted(self.providers, key=lambda p: get_stats(p[0]).error_rate >= 0.5
+                      or get_stats(p[0], self.call_site).error_rate >= 0.5)
+
+    def _call(self, name: str, llm, input, config, kwargs):
+        global _in_flight
+        start = time.perf_counter()
+        try:
+            result = llm.invoke(input, config=config, **kwargs)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            get_stats(name, self.call_site).record(seconds, ok=False)
+            if not is_request_error(e):
+                get_stats(name).record(seconds, ok=False)
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight -= 1
+        seconds = time.perf_counter() - start
+        get_stats(name).record(seconds, ok=True)
+        get_stats(name, self.call_site).record(seconds, ok=True)
+        return result
+
+    def invoke(self, input, config=None, **kwargs):
+        candidates = self.ranked()
+        pending = {}
+        last_error = None
+        launched = 0
+
+        def launch(as_hedge: bool = False):
+            global _in_flight
+            nonlocal launched
+            name, llm = candidates[launched]
+            launched += 1
+            with _in_flight_lock:
+                _in_flight += 1
+            pending[_executor.submit(self._call, name, llm, input, config, kwargs)] = as_hedge
+            return name
+
+        delay = self.hedge_delay(launch())
+        while pending:
+            can_hedge = self.hedging and launched < len(candidates)
+            done, _ = wait(pending, timeout=delay if can_hedge else None, return_when=FIRST_COMPLETED)
+            if not done:
+                if executor_saturated():
+                    # The delay may be our own queueing; a duplicate would only queue too
+                    continue
+                # Slower than this provider's usual tail: race a duplicate on the next one
+                self._count("hedges_sent")
+                delay = self.hedge_delay(launch(as_hedge=True))
+                continue
+            for future in done:
+                as_hedge = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                # Failover answers are counted in failovers, not here
+                if as_hedge:
+                    self._count("hedge_wins")
+                return result
+            if not pending and launched < len(candidates):
+                self._count("failovers")
+                delay = self.hedge_delay(launch())
+        raise last_error
+
+    def with_structured_output(self, schema, **kwargs):
+        return HedgedRouter(
+            [(name, llm.with_structured_output(schema, **kwargs)) for name, llm in self.providers],
+            hedging=self.hedging, default_delay_s=self.default_delay_s, min_delay_s=self.min_delay_s,
+            min_samples=self.min_samples, hedge_percentile=self.hedge_percentile,
+            call_site=f"{self.call_site}.{getattr(schema, '__name__', 'structured')}",
+        )
+
+
+def _fallbacks() -> list:
+    value = os.getenv("LLM_FALLBACKS", "groq:llama3-70b-8192,openai:gpt-4o-mini")
+    return [tuple(item.strip().split(":", 1)) for item in value.split(",") if ":" in item]
+
+
+def get_routed_chat_model(provider: str, model: str, call_site: str = "default", **kwargs):
+    """Return a shared router with provider:model first and the configured fallbacks after it.
+
+    call_site groups requests of similar size for the hedge delay; give
+    long-prompt call sites their own name. Fallbacks whose API key is not
+    set are skipped. kwargs such as temperature go to every provider.
+    Routers are cached like the clients in agent_common.clients, so their
+    hedge counters survive Streamlit reruns.
+    """
+    chain = [(provider, model)]
+    for fallback in _fallbacks():
+        if fallback not in chain and os.getenv(PROVIDER_KEYS.get(fallback[0], ""), ""):
+            chain.append(fallback)
+    key = ("router", call_site, tuple(chain), tuple(sorted(kwargs.items())))
+
+    def factory():
+        providers = [(f"{provider}:{model}", get_chat_model(provider, model, **kwargs))]
+        # Fallbacks read their own API key from the environment
+        shared_kwargs = {k: v for k, v in kwargs.items() if k != "api_key"}
+        for fallback_provider, fallback_model in chain[1:]:
+            providers.append((f"{fallback_provider}:{fallback_model}",
+                              get_chat_model(fallback_provider, fallback_model, **shared_kwargs)))
+        return HedgedRouter(providers, call_site=call_site)
+
+    return get_or_create(key, factory)
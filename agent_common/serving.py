@@ -0,0 +1,473 @@
+"""Local job server that runs the agent graphs for many users at once.
+
+Each served agent gets a bounded job queue and its own pool of worker
+threads that import the agent once and run its compiled `app`. Submitting
+a job returns at once with a job id. When an agent's queue is full the
+server answers 429 with a Retry-After estimate instead of queueing without
+limit, so accepted jobs keep a bounded wait under overload. Finished jobs
+are kept for AGENT_JOB_TTL_S seconds for polling.
+
+PyMuPDF is not thread-safe, so the PDF agents (document_extractor,
+summarizer) hold agent_common.pdf.FITZ_LOCK around their fitz calls; jobs
+on different worker threads take turns on fitz and overlap on everything else.
+
+Endpoints:
+    POST /agents/<name>/jobs     JSON initial state -> 202 {"job_id", "status", "status_url"}
+                                 429 with Retry-After when the queue is full
+    GET  /jobs/<id>[?wait=S]     Job status, plus "result" or "error" when finished;
+                                 wait long-polls up to S seconds for completion
+    GET  /agents                 Served agents with workers, queue depth and capacity
+    POST /uploads                Raw file body -> 201 {"upload_id"}; the body is streamed to
+                                 a spool file instead of being held in memory
+
+Bytes in requests and results travel as {"__bytes__": "<base64>"}; PIL
+images are returned as PNG bytes and pydantic models as dicts. JSON job
+bodies are capped at AGENT_SERVER_MAX_BODY_MB (413 above it), because a
+base64 document is copied several times while its job waits. Large files
+are uploaded first and referenced in the state as {"__upload__": "<id>"},
+which the server replaces with the spool file's path, so an agent reads
+them from disk as it would a local file (e.g. Summarizer's "text_file").
+A job's uploads are deleted when it finishes; unused ones after AGENT_JOB_TTL_S.
+agent_common.remote does the encoding on the client side.
+
+The HITL persona agent is not served: it pauses on graph interrupts and
+keeps per-session checkpoints, which does not fit fire-and-poll jobs.
+The Addtocart agent is served for order tracking only ({"order_id": ...}):
+its cart and checkout steps need a browser the user is sitting at.
+
+Environment variables:
+    AGENT_SERVER_WORKERS          Worker threads per agent (default: 4)
+    AGENT_SERVER_WORKERS_<AGENT>  Override for one agent, e.g. AGENT_SERVER_WORKERS_SUMMARIZER
+    AGENT_SERVER_QUEUE            Jobs waiting per agent before 429 (default: 16; 0 = unbounded)
+    AGENT_JOB_TTL_S               Seconds finished jobs and unused uploads are kept (default: 600)
+    AGENT_SERVER_MAX_BODY_MB      Largest JSON job body (default: 16)
+    AGENT_SERVER_MAX_UPLOAD_MB    Largest upload (default: 1024)
+
+Usage:
+    python -m agent_common.serving --port 8500
+    python -m agent_common.serving --agents summarizer,blog_generator --workers 8 --queue-size 32
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common.agents import load_agent
+
+MAX_WAIT_S = 30.0  # Longest long-poll a client can ask for
+MAX_BODY_BYTES = int(float(os.getenv("AGENT_SERVER_MAX_BODY_MB", "16")) * 2**20)
+MAX_UPLOAD_BYTES = int(float(os.getenv("AGENT_SERVER_MAX_UPLOAD_MB", "1024")) * 2**20)
+UPLOAD_BLOCK_BYTES = 1 << 20  # Uploads are copied to disk this much at a time
+
+
+def _run_graph(module, state: dict) -> dict:
+    return module.app.invoke(state)
+
+
+def _run_youtube(module, state: dict) -> dict:
+    transcript = module.extract_transcript_details(state["youtube_url"])
+    if not transcript:
+        raise ValueError("Failed to fetch transcript.")
+    summary = module.generate_gemini_content(transcript, state.get("prompt", module.prompt))
+    if not summary:
+        raise ValueError("Failed to generate summary.")
+    return {"youtube_url": state["youtube_url"], "summary": summary}
+
+
+def _run_add_to_cart(module, state: dict) -> dict:
+    # Only order tracking is served: the cart step needs a browser the user can check
+    # out from, and the server's Chrome session is gone when the job ends. Each job
+    # checks the order once; clients poll with new jobs, so no worker sleeps between checks
+    if not state.get("order_id"):
+        raise ValueError("add_to_cart jobs track an existing order; pass its order_id. "
+                         "Run 6-Addtocart/addtocart.py locally to fill the cart and check out.")
+    return module.track_order(state["order_id"], max_checks=1)
+
+
+# agent -> runner(module, initial state) returning the final state
+SERVED_AGENTS = {
+    "document_extractor": _run_graph,
+    "summarizer": _run_graph,
+    "blog_generator": _run_graph,
+    "image_recognition": _run_graph,
+    "orchestrator_synthesizer": _run_graph,
+    "add_to_cart": _run_add_to_cart,
+    "youtube_summarizer": _run_youtube,
+}
+
+
+def to_jsonable(value):
+    """Convert agent state into JSON-safe values."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"__bytes__": base64.b64encode(bytes(value)).decode("ascii")}
+    if hasattr(value, "model_dump"):  # pydantic
+        return to_jsonable(value.model_dump())
+    if hasattr(value, "save") and hasattr(value, "size"):  # PIL image
+        buffer = io.BytesIO()
+        value.save(buffer, format="PNG")
+        return to_jsonable(buffer.getvalue())
+    return str(value)
+
+
+def from_jsonable(value):
+    """Undo to_jsonable's bytes encoding."""
+    if isinstance(value, dict):
+        if set(value) == {"__bytes__"}:
+            return base64.b64decode(value["__bytes__"])
+        return {k: from_jsonable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [from_jsonable(v) for v in value]
+    return value
+
+
+class QueueFull(Exception):
+    """Raised by AgentPool.submit when the agent's queue has no room."""
+
+    def __init__(self, retry_after_s: int):
+        super().__init__(f"Queue full, retry after {retry_after_s}s")
+        self.retry_after_s = retry_after_s
+
+
+class JobStore:
+    """Jobs by id; finished jobs are dropped ttl_s seconds after they finish."""
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def add(self, agent: str, state: dict) -> dict:
+        job = {"id": uuid.uuid4().hex, "agent": agent, "status": "queued", "submitted": time.time(),
+               "started": None, "finished": None, "state": state, "done": threading.Event()}
+        with self._lock:
+            self._prune()
+            self._jobs[job["id"]] = job
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_s
+        expired = [job_id for job_id, job in self._jobs.items() if job["finished"] and job["finished"] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class UploadStore:
+    """Uploaded files spooled to a temporary directory, by id.
+
+    An upload belongs to the store until a job that references it is
+    accepted; then the job owns the file and its worker deletes it. Uploads
+    no job claimed are deleted ttl_s seconds after they arrived.
+    """
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self.dir = tempfile.mkdtemp(prefix="agent-uploads-")
+        self._lock = threading.Lock()
+        self._uploads = {}  # id -> (path, arrived)
+
+    def save(self, stream, length: int) -> str:
+        upload_id = uuid.uuid4().hex
+        path = os.path.join(self.dir, upload_id)
+        try:
+            with open(path, "wb") as f:
+                remaining = length
+                while remaining:
+                    block = stream.read(min(remaining, UPLOAD_BLOCK_BYTES))
+                    if not block:
+                        raise ValueError(f"Upload ended {remaining} bytes short of Content-Length")
+                    f.write(block)
+                    remaining -= len(block)
+        except BaseException:
+            _remove_files([path])
+            raise
+        with self._lock:
+            self._prune()
+            self._uploads[upload_id] = (path, time.time())
+        return upload_id
+
+    def resolve(self, value, used: dict):
+        """Replace {"__upload__": id} markers in value with file paths, recorded in used by id."""
+        if isinstance(value, dict):
+            if set(value) == {"__upload__"}:
+                with self._lock:
+                    self._prune()
+                    if value["__upload__"] not in self._uploads:
+                        raise KeyError(f"Unknown or expired upload '{value['__upload__']}'")
+                    used[value["__upload__"]] = self._uploads[value["__upload__"]][0]
+                    return used[value["__upload__"]]
+            return {k: self.resolve(v, used) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(v, used) for v in value]
+        return value
+
+    def claim(self, upload_ids):
+        """Hand uploads over to an accepted job, which deletes them when it finishes."""
+        with self._lock:
+            for upload_id in upload_ids:
+                self._uploads.pop(upload_id, None)
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_s
+        expired = [upload_id for upload_id, (_, arrived) in self._uploads.items() if arrived < cutoff]
+        _remove_files([self._uploads.pop(upload_id)[0] for upload_id in expired])
+
+
+class AgentPool:
+    """A bounded queue and worker threads running one agent's jobs."""
+
+    def __init__(self, agent: str, runner, workers: int, queue_size: int):
+        self.agent = agent
+        self.runner = runner
+        self.workers = workers
+        self.queue_size = queue_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._service_s = 0.0  # Moving average of run time, for Retry-After
+        self._module = None
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"{agent}-worker-{i}", daemon=True).start()
+
+    def submit(self, job: dict):
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFull(self.retry_after_s()) from None
+
+    def retry_after_s(self) -> int:
+        # Time for the workers to drain the current queue
+        return max(1, math.ceil(self._service_s * self._queue.qsize() / max(1, self.workers)))
+
+    def status(self) -> dict:
+        return {"workers": self.workers, "queued": self._queue.qsize(), "queue_size": self.queue_size,
+                "mean_run_s": round(self._service_s, 3)}
+
+    def load(self):
+        """Import the agent once; workers call this on their first job."""
+        with self._lock:
+            if self._module is None:
+                self._module = load_agent(self.agent)
+            return self._module
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job["status"], job["started"] = "running", time.time()
+            try:
+                job["result"] = to_jsonable(self._result(self.runner(self.load(), job["state"]), job["state"]))
+                job["status"] = "done"
+            except Exception as e:
+                job["error"], job["status"] = f"{type(e).__name__}: {e}", "error"
+            job["finished"] = time.time()
+            job.pop("state", None)
+            _remove_files(job.pop("uploads", []))
+            with self._lock:
+                elapsed = job["finished"] - job["started"]
+                self._service_s = elapsed if not self._service_s else 0.8 * self._service_s + 0.2 * elapsed
+            job["done"].set()
+            self._queue.task_done()
+
+    @staticmethod
+    def _result(final_state: dict, initial_state: dict) -> dict:
+        # Uploaded files are not echoed back to the client
+        return {k: v for k, v in (final_state or {}).items()
+                if not (k in initial_state and isinstance(v, (bytes, bytearray)))}
+
+
+class AgentServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pools: dict, jobs: JobStore, uploads: UploadStore):
+        super().__init__(address, _Handler)
+        self.pools = pools
+        self.jobs = jobs
+        self.uploads = uploads
+        self.max_body_bytes = MAX_BODY_BYTES
+        self.max_upload_bytes = MAX_UPLOAD_BYTES
+
+    def server_close(self):
+        super().server_close()
+        self.uploads.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _reject_body(self, status: int, error: str):
+        # The body is left unread, so the connection cannot be reused
+        self.close_connection = True
+        return self._send(status, {"error": error}, {"Connection": "close"})
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        if parts == ["uploads"]:
+            return self._upload(length)
+        if len(parts) != 3 or parts[0] != "agents" or parts[2] != "jobs":
+            return self._reject_body(404, "Not found")
+        pool = self.server.pools.get(parts[1])
+        if pool is None:
+            return self._reject_body(404, f"Agent '{parts[1]}' is not served")
+        if length > self.server.max_body_bytes:
+            return self._reject_body(413, f"Job body over {self.server.max_body_bytes} bytes; "
+                                          "send large files with POST /uploads and reference them as {\"__upload__\": id}")
+        body = self.rfile.read(length)
+        try:
+            state = from_jsonable(json.loads(body or b"{}"))
+        except ValueError as e:
+            return self._send(400, {"error": f"Invalid JSON: {e}"})
+        if not isinstance(state, dict):
+            return self._send(400, {"error": "The request body must be a JSON object"})
+        used = {}
+        try:
+            state = self.server.uploads.resolve(state, used)
+        except KeyError as e:
+            return self._send(400, {"error": e.args[0]})
+
+        job = self.server.jobs.add(pool.agent, state)
+        job["uploads"] = list(used.values())
+        try:
+            pool.submit(job)
+        except QueueFull as e:
+            # The uploads stay with the store, so the client can retry with the same state
+            job.pop("uploads")
+            self.server.jobs.discard(job["id"])
+            return self._send(429, {"error": str(e), "retry_after_s": e.retry_after_s},
+                              {"Retry-After": str(e.retry_after_s)})
+        self.server.uploads.claim(used)
+        self._send(202, {"job_id": job["id"], "status": "queued", "status_url": f"/jobs/{job['id']}"},
+                   {"Location": f"/jobs/{job['id']}"})
+
+    def _upload(self, length: int):
+        if not length:
+            return self._reject_body(411, "Uploads need a Content-Length")
+        if length > self.server.max_upload_bytes:
+            return self._reject_body(413, f"Upload over {self.server.max_upload_bytes} bytes")
+        try:
+            upload_id = self.server.uploads.save(self.rfile, length)
+        except ValueError as e:
+            return self._reject_body(400, str(e))
+        self._send(201, {"upload_id": upload_id})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts == ["agents"]:
+            return self._send(200, {name: pool.status() for name, pool in self.server.pools.items()})
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send(404, {"error": "Not found"})
+        job = self.server.jobs.get(parts[1])
+        if job is None:
+            return self._send(404, {"error": "Unknown or expired job"})
+        try:
+            wait_s = float(parse_qs(url.query).get("wait", ["0"])[0] or 0)
+        except ValueError:
+            return self._send(400, {"error": "wait must be a number of seconds"})
+        if wait_s > 0:
+            job["done"].wait(min(wait_s, MAX_WAIT_S))
+        body = {k: job[k] for k in ("id", "agent", "status", "submitted", "started", "finished")}
+        for key in ("result", "error"):
+            if key in job:
+                body[key] = job[key]
+        self._send(200, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _workers_for(agent: str, default: int) -> int:
+    return int(os.getenv(f"AGENT_SERVER_WORKERS_{agent.upper()}", default))
+
+
+def create_server(agents=None, host: str = "127.0.0.1", port: int = 8500, workers: int = None,
+                  queue_size: int = None, ttl_s: float = None) -> AgentServer:
+    """Build (but do not start) a server for agents, default every servable agent.
+
+    Agents already imported with load_agent() are served as they are, so a
+    caller can patch a module (e.g. with benchmark fakes) before serving it.
+    """
+    workers = workers if workers is not None else int(os.getenv("AGENT_SERVER_WORKERS", "4"))
+    queue_size = queue_size if queue_size is not None else int(os.getenv("AGENT_SERVER_QUEUE", "16"))
+    ttl_s = ttl_s if ttl_s is not None else float(os.getenv("AGENT_JOB_TTL_S", "600"))
+    pools = {}
+    for agent in agents or list(SERVED_AGENTS):
+        if agent not in SERVED_AGENTS:
+            raise ValueError(f"Agent '{agent}' cannot be served. Choose from: {', '.join(SERVED_AGENTS)}")
+        pools[agent] = AgentPool(agent, SERVED_AGENTS[agent], _workers_for(agent, workers), queue_size)
+    return AgentServer((host, port), pools, JobStore(ttl_s), UploadStore(ttl_s))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", help=f"Comma-separated agents (default: all of {', '.join(SERVED_AGENTS)})")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--workers", type=int, help="Worker threads per agent")
+    parser.add_argument("--queue-size", type=int, help="Jobs waiting per agent before 429")
+    parser.add_argument("--preload", action="store_true", help="Import the agents at start-up, not on first job")
+    args = parser.parse_args(argv)
+
+    agents = args.agents.split(",") if args.agents else None
+    server = create_server(agents, args.host, args.port, args.workers, args.queue_size)
+    if args.preload:
+        for pool in server.pools.values():
+            pool.load()
+    print(f"Serving {', '.join(server.pools)} on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Streaming large text files in chunks without loading them whole.
+
+A file is memory-mapped one MMAP_WINDOW_BYTES window at a time, so
+resident memory stays bounded however large it is, and decoded to str a
+chunk at a time. In-memory bytes are sliced the same way without copies.
+"""
+import codecs
+import mmap
+import os
+
+# mmap offsets must be multiples of the allocation granularity
+MMAP_WINDOW_BYTES = (8 << 20) // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY
+
+
+def _window_bytes(source):
+    """Yield the raw bytes of a text file path, or of an in-memory upload, in windows."""
+    if not isinstance(source, str):
+        view = memoryview(source)
+        for start in range(0, len(view), MMAP_WINDOW_BYTES):
+            yield view[start:start + MMAP_WINDOW_BYTES]
+        return
+    with open(source, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        for offset in range(0, size, MMAP_WINDOW_BYTES):
+            with mmap.mmap(f.fileno(), min(MMAP_WINDOW_BYTES, size - offset), offset=offset, access=mmap.ACCESS_READ) as window:
+                yield window
+
+
+def iter_text_chunks(source, chunk_chars: int):
+    """Yield the text of a file path or bytes in chunks of at most chunk_chars.
+
+    Chunks end on a line break or space where possible, and multi-byte UTF-8
+    characters split across windows are decoded intact. Only about one chunk
+    is held as str at a time.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
+    for window in _window_bytes(source):
+        for start in range(0, len(window), chunk_chars):
+            carry += decoder.decode(window[start:start + chunk_chars])
+            while len(carry) >= chunk_chars:
+                cut = max(carry.rfind("\n", chunk_chars // 2, chunk_chars), carry.rfind(" ", chunk_chars // 2, chunk_chars))
+                cut = cut + 1 if cut > 0 else chunk_chars
+                yield carry[:cut]
+                carry = carry[cut:]
+    carry += decoder.decode(b"", final=True)
+    if carry.strip():
+        yield carry
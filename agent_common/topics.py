@@ -0,0 +1,75 @@
+"""Topic normalization and clustering for bulk blog generation.
+
+Topics are grouped only when they are about the same subject: after
+stopwords and generic facet words ("features", "tips", "performance", ...)
+are removed, their remaining tokens must be identical. So "X200 camera low
+light features" and "X200 camera low light performance" share research,
+while "X300 camera battery life" and "X200 camera battery life", or "Rust
+for data science" and "Python for data science", do not. Each cluster is
+searched once with a query that combines the words of all its topics.
+"""
+import re
+
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "in", "on", "to", "with", "how", "what", "why", "your", "our",
+             "is", "are", "vs"}
+# Words that name an angle on a subject rather than the subject itself (after plural folding)
+FACET_WORDS = {"feature", "performance", "tip", "guide", "overview", "review", "benefit", "introduction", "intro",
+               "basic", "explained", "best", "top", "key", "latest", "update", "detail", "advice", "trick"}
+
+
+def _fold(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def normalize_topic(topic: str) -> frozenset:
+    """Lowercase content words of a topic, with simple plurals folded."""
+    words = re.findall(r"[a-z0-9]+", topic.lower())
+    return frozenset(_fold(w) for w in words if w not in STOPWORDS)
+
+
+def subject_tokens(topic: str) -> frozenset:
+    """Content words of a topic that name its subject, i.e. without facet words."""
+    return normalize_topic(topic) - FACET_WORDS
+
+
+def shares_subject(topics) -> bool:
+    """True if every topic has the same non-empty subject."""
+    subjects = {subject_tokens(t) for t in topics}
+    return len(subjects) == 1 and bool(next(iter(subjects)))
+
+
+def combined_query(topics) -> str:
+    """First topic, followed by any words the other topics add to it."""
+    query, seen = [topics[0]], set(normalize_topic(topics[0]))
+    for topic in topics[1:]:
+        for word in re.findall(r"[A-Za-z0-9]+", topic):
+            token = _fold(word.lower())
+            if word.lower() not in STOPWORDS and token not in seen:
+                seen.add(token)
+                query.append(word)
+    return " ".join(query)
+
+
+def cluster_topics(topics):
+    """Drop duplicate topics and group those with the same subject.
+
+    Returns a list of {"query", "key", "topics"} dicts, where key is the
+    shared subject and query is what the cluster is searched with. A topic
+    made only of facet words is never grouped.
+    """
+    clusters, seen = [], set()
+    for topic in topics:
+        key = normalize_topic(topic)
+        if not topic.strip() or key in seen:
+            continue
+        seen.add(key)
+        subject = subject_tokens(topic)
+        for cluster in clusters:
+            if subject and cluster["key"] == subject:
+                cluster["topics"].append(topic)
+                break
+        else:
+            clusters.append({"key": subject, "topics": [topic]})
+    for cluster in clusters:
+        cluster["query"] = combined_query(cluster["topics"])
+    return clusters
@@ -0,0 +1,115 @@
+"""Per-call latency of a new ChatOpenAI per call vs the shared pooled client.
+
+A local stub serves the OpenAI chat completions endpoint over HTTP/1.1
+keep-alive, and counts the TCP connections it accepts. Both modes send the
+same requests. The difference is client construction plus connection setup,
+which is what reason_content, answer_question and summarize paid on every call
+before they used agent_common.clients. Over the internet the gap is larger,
+because each new connection also pays a TLS handshake.
+
+Usage:
+    python -m benchmarks.bench_clients --calls 200 --server-latency-ms 5
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common.clients import close_clients, get_chat_model
+from benchmarks.run_benchmarks import percentile
+
+
+class StubOpenAIServer:
+    """Minimal /v1/chat/completions endpoint; use as a context manager."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.connections = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(latency_ms / 1000.0)
+                body = json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "gpt-4o-mini",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "Stub answer."}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+
+def run_mode(make_llm, calls: int) -> list:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        make_llm().invoke("Summarize this text concisely: hello")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--server-latency-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    from langchain_openai import ChatOpenAI
+
+    with StubOpenAIServer(args.server_latency_ms) as server:
+        settings = {"base_url": server.base_url, "api_key": "stub", "temperature": 0.2, "max_retries": 0}
+        modes = {
+            "new client per call": lambda: ChatOpenAI(model="gpt-4o-mini", **settings),
+            "shared pooled client": lambda: get_chat_model("openai", "gpt-4o-mini", **settings),
+        }
+        results = {}
+        for name, make_llm in modes.items():
+            run_mode(make_llm, 5)  # Warm-up (imports, first connection)
+            before = server.connections
+            latencies = run_mode(make_llm, args.calls)
+            results[name] = (latencies, server.connections - before)
+        close_clients()
+
+    print(f"{'mode':24} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'connections':>12}")
+    for name, (latencies, connections) in results.items():
+        print(f"{name:24} {sum(latencies) / len(latencies) * 1000:9.2f} {percentile(latencies, 50) * 1000:9.2f} "
+              f"{percentile(latencies, 95) * 1000:9.2f} {connections:12d}")
+    fresh, pooled = (sum(r[0]) / len(r[0]) for r in results.values())
+    print(f"\nSaved per call: {(fresh - pooled) * 1000:.2f} ms ({(fresh - pooled) / fresh:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Tail latency of a single provider vs HedgedRouter, using fake providers.
+
+The primary provider has a fast median with a slow tail: a share of calls
+are stragglers, like an overloaded endpoint. The secondary is a little
+slower but steady. Each scenario sends the same number of requests straight
+to the primary and then through the router, and reports p50/p95/p99, the
+error rate and how many extra requests hedging cost.
+
+Usage:
+    python -m benchmarks.bench_routing --requests 1000 --tail-prob 0.02
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common import routing
+from agent_common.routing import HedgedRouter
+from benchmarks.fakes import FakeChatModel, Latency
+from benchmarks.run_benchmarks import percentile
+
+
+def drive(llm, requests: int, concurrency: int):
+    def one(_):
+        start = time.perf_counter()
+        try:
+            llm.invoke("Write a short blog post.")
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    latencies = [seconds for seconds, _ in results]
+    errors = sum(not ok for _, ok in results)
+    return latencies, errors
+
+
+def report(label: str, latencies: list, errors: int, extra: str = ""):
+    print(f"{label:28} {percentile(latencies, 50) * 1000:8.0f} {percentile(latencies, 95) * 1000:8.0f} "
+          f"{percentile(latencies, 99) * 1000:8.0f} {errors / len(latencies):8.1%}  {extra}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--primary-ms", type=float, default=100.0, help="Primary median latency")
+    parser.add_argument("--secondary-ms", type=float, default=140.0, help="Secondary median latency")
+    parser.add_argument("--tail-prob", type=float, default=0.02,
+                        help="Share of primary calls that straggle; hedging at p95 targets tails rarer than 5%%")
+    parser.add_argument("--tail-ms", type=float, default=2000.0, help="Straggler latency")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Primary error rate in the failover scenario")
+    args = parser.parse_args(argv)
+
+    scenarios = {
+        "slow tail": 0.0,
+        "slow tail + errors": args.error_rate,
+    }
+    print(f"{'':28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>8}")
+    for scenario, error_rate in scenarios.items():
+        routing._stats.clear()
+        primary = FakeChatModel(Latency(args.primary_ms, tail_prob=args.tail_prob, tail_ms=args.tail_ms, seed=1),
+                                error_rate=error_rate)
+        secondary = FakeChatModel(Latency(args.secondary_ms, seed=2))
+        print(f"-- {scenario}")
+        latencies, errors = drive(primary, args.requests, args.concurrency)
+        report("primary only", latencies, errors)
+
+        primary.calls = secondary.calls = 0
+        router = HedgedRouter([("primary", primary), ("secondary", secondary)],
+                              hedging=True, default_delay_s=args.primary_ms * 3 / 1000, min_delay_s=0.0)
+        latencies, errors = drive(router, args.requests, args.concurrency)
+        extra_calls = (primary.calls + secondary.calls - args.requests) / args.requests
+        report("hedged router", latencies, errors,
+               f"extra calls {extra_calls:.1%}, hedges {router.hedges_sent}, hedge wins {router.hedge_wins}, "
+               f"failovers {router.failovers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Peak RSS of the Summarizer on a large plain-text file, streamed vs whole.
+
+The "text_file" mode streams the file through mmap windows and summarizes
+it chunk by chunk. The "text" mode is the old path: the whole file is read
+into input_text, then copied into the graph state and the prompt. Each
+mode runs in its own subprocess against a zero-latency fake LLM, and
+reports how far peak RSS grew above the RSS after the agent was imported.
+
+Usage:
+    python -m benchmarks.bench_text_memory --megabytes 100 --max-growth-mb 64
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import text_fixture
+
+MODES = ("text_file", "text")
+
+
+def _peak_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def run_worker(mode: str, path: str) -> dict:
+    from agent_common.agents import load_agent
+    from benchmarks.fakes import FakeChatModelFactory, Latency
+    from benchmarks.run_benchmarks import FAKE_ENV
+
+    os.environ.update(FAKE_ENV)
+    module = load_agent("summarizer")
+    module.get_routed_chat_model = FakeChatModelFactory(Latency(0))
+    baseline = _peak_rss_bytes()
+
+    start = time.perf_counter()
+    if mode == "text_file":
+        state = {"input_type": "text_file", "input_path": path}
+    else:
+        with open(path, encoding="utf-8") as f:
+            state = {"input_type": "text", "input_text": f.read()}
+    result = module.app.invoke({**state, "text_content": [], "summary": ""})
+    return {
+        "mode": mode,
+        "seconds": round(time.perf_counter() - start, 2),
+        "chunks": result.get("chunks", 1),
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "growth_bytes": _peak_rss_bytes() - baseline,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=int, default=100, help="Size of the generated text file")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated modes to run")
+    parser.add_argument("--max-growth-mb", type=float, default=64.0,
+                        help="Exit with status 1 if the streamed mode grows peak RSS by more than this")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.path)))
+        return 0
+
+    path = text_fixture(args.megabytes)
+    size_mb = os.path.getsize(path) / 2**20
+    print(f"{'mode':12} {'file MB':>8} {'chunks':>8} {'seconds':>8} {'RSS growth MB':>14}")
+    status = 0
+    for mode in args.modes.split(","):
+        completed = subprocess.run([sys.executable, "-m", "benchmarks.bench_text_memory", "--worker", mode,
+                                    "--path", path], cwd=REPO_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{mode}: worker failed\n{completed.stderr}", file=sys.stderr)
+            status = 1
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        growth_mb = result["growth_bytes"] / 2**20
+        print(f"{mode:12} {size_mb:8.0f} {result['chunks']:8} {result['seconds']:8.1f} {growth_mb:14.1f}")
+        if mode == "text_file" and growth_mb > args.max_growth_mb:
+            print(f"text_file: peak RSS grew {growth_mb:.0f} MB, above --max-growth-mb {args.max_growth_mb:.0f}",
+                  file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
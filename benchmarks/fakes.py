@@ -0,0 +1,231 @@
+"""Stub LLM, search, OCR and transcript backends with configurable latency.
+
+Each fake mimics just enough of the real client's interface for the agent
+code to run unchanged, sleeping for a sampled latency instead of calling
+the network.
+"""
+import random
+import re
+import time
+from types import SimpleNamespace
+
+
+class Latency:
+    """Log-normal latency around a median, in milliseconds.
+
+    With tail_prob > 0, that share of calls takes tail_ms instead, modelling
+    an overloaded endpoint's stragglers.
+    """
+
+    def __init__(self, median_ms: float = 0.0, spread: float = 0.25, seed: int = None,
+                 tail_prob: float = 0.0, tail_ms: float = 0.0):
+        self.median_ms = median_ms
+        self.spread = spread
+        self.tail_prob = tail_prob
+        self.tail_ms = tail_ms
+        self._random = random.Random(seed)
+
+    def sample_s(self) -> float:
+        if self.tail_prob and self._random.random() < self.tail_prob:
+            return self.tail_ms * self._random.lognormvariate(0, self.spread) / 1000.0
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms * self._random.lognormvariate(0, self.spread) / 1000.0
+
+    def wait(self):
+        delay = self.sample_s()
+        if delay:
+            time.sleep(delay)
+
+
+def _prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, (list, tuple)):
+        return "\n".join(getattr(m, "content", str(m)) for m in prompt)
+    return str(prompt)
+
+
+def _message(content: str, prompt_text: str):
+    """An AIMessage look-alike with LangChain usage metadata."""
+    return SimpleNamespace(
+        content=content,
+        usage_metadata={
+            "input_tokens": len(prompt_text) // 4,
+            "output_tokens": len(content) // 4,
+            "total_tokens": (len(prompt_text) + len(content)) // 4,
+        },
+    )
+
+
+class FakeChatModel:
+    """Stands in for ChatOpenAI / ChatGroq.
+
+    structured maps a pydantic schema to a factory(prompt_text) returning an
+    instance, used by with_structured_output().
+    """
+
+    def __init__(self, latency: Latency = None, reply_words: int = 120, structured: dict = None,
+                 error_rate: float = 0.0, **_):
+        self.latency = latency or Latency()
+        self.reply_words = reply_words
+        self.structured = structured or {}
+        self.error_rate = error_rate
+        self.calls = 0
+
+    def invoke(self, prompt, config=None, **_):
+        self.calls += 1
+        self.latency.wait()
+        if self.error_rate and random.random() < self.error_rate:
+            raise ConnectionError("Injected provider error")
+        text = _prompt_text(prompt)
+        return _message(" ".join(["lorem"] * self.reply_words), text)
+
+    def with_structured_output(self, schema, include_raw: bool = False, **_):
+        return _FakeStructuredModel(self, schema, include_raw)
+
+
+class _FakeStructuredModel:
+    def __init__(self, model: FakeChatModel, schema, include_raw: bool):
+        self.model = model
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def invoke(self, prompt, config=None, **_):
+        raw = self.model.invoke(prompt)
+        parsed = self.model.structured[self.schema](_prompt_text(prompt))
+        if self.include_raw:
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+        return parsed
+
+    def batch(self, prompts, config=None, **_):
+        return [self.invoke(p) for p in prompts]
+
+
+class FakeChatModelFactory:
+    """Callable replacement for a chat model class such as ChatOpenAI."""
+
+    def __init__(self, latency: Latency = None, **kwargs):
+        self.latency = latency
+        self.kwargs = kwargs
+        self.instances = 0
+
+    def __call__(self, *args, **kwargs):
+        self.instances += 1
+        return FakeChatModel(self.latency, **self.kwargs)
+
+
+class FakeTavilySearch:
+    """Stands in for TavilySearchResults."""
+
+    def __init__(self, latency: Latency = None, results: int = 3):
+        self.latency = latency or Latency()
+        self.results = results
+        self.calls = 0
+
+    def run(self, query: str):
+        self.calls += 1
+        self.latency.wait()
+        return [{"url": f"https://example.com/{i}", "content": f"Result {i} about {query}. " * 20}
+                for i in range(self.results)]
+
+
+class FakeDDGS:
+    """Stands in for duckduckgo_search.DDGS; results come from a callable(query)."""
+
+    def __init__(self, latency: Latency = None, results=None):
+        self.latency = latency or Latency()
+        self.results = results or (lambda query: [
+            {"title": f"Result {i}", "href": f"https://example.com/{i}", "body": f"Trend {i} for {query}."}
+            for i in range(3)
+        ])
+        self.calls = 0
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query: str, max_results: int = 10):
+        self.calls += 1
+        self.latency.wait()
+        return self.results(query)[:max_results]
+
+
+class FakeTesseract:
+    """Stands in for the pytesseract module."""
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.calls = 0
+
+    def image_to_string(self, image, *args, **kwargs):
+        self.calls += 1
+        self.latency.wait()
+        width, height = getattr(image, "size", (0, 0))
+        return f"OCR text from a {width}x{height} image."
+
+
+class FakeOpenAIClient:
+    """Stands in for openai.OpenAI (chat.completions.create only)."""
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.calls = 0
+
+    def _create(self, model: str, messages: list, **_):
+        self.calls += 1
+        self.latency.wait()
+        content = "A small brown animal sitting in the grass."
+        prompt_chars = sum(len(str(m)) for m in messages)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_chars // 4, completion_tokens=len(content) // 4),
+        )
+
+
+class FakeGenAI:
+    """Stands in for the google.generativeai module."""
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.calls = 0
+
+    def configure(self, **_):
+        pass
+
+    def GenerativeModel(self, name: str, **_):
+        return SimpleNamespace(generate_content=self._generate)
+
+    def _generate(self, prompt: str, **_):
+        self.calls += 1
+        self.latency.wait()
+        text = " ".join(["note"] * 200)
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4),
+        )
+
+
+class FakeTranscriptApi:
+    """Stands in for YouTubeTranscriptApi (get_transcript only)."""
+
+    def __init__(self, latency: Latency = None, segments: int = 400):
+        self.latency = latency or Latency()
+        self.segments = segments
+
+    def get_transcript(self, video_id: str, *args, **kwargs):
+        self.latency.wait()
+        return [{"text": f"segment {i} of {video_id}", "start": i * 2.0, "duration": 2.0}
+                for i in range(self.segments)]
+
+
+def count_requested(prompt_text: str, default: int = 3) -> int:
+    """Read 'top N' from an analyst prompt so fakes return the right count."""
+    match = re.search(r"top (\d+)", prompt_text)
+    return int(match.group(1)) if match else default
@@ -0,0 +1,122 @@
+"""Generated PDF, image and text fixtures, from small to very large.
+
+Fixtures are written once to benchmarks/fixtures/ and reused by later runs.
+"""
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# name -> (pages, images per page, every Nth page is a scan without text layer)
+PDF_SIZES = {
+    "small": (1, 0, 0),
+    "medium": (20, 1, 4),
+    "large": (200, 1, 4),
+    "xlarge": (1000, 2, 4),
+}
+FIXTURE_VERSION = 2  # Bump when the generators change so stale files are rebuilt
+
+# name -> (width, height)
+IMAGE_SIZES = {
+    "small": (200, 200),
+    "medium": (1024, 768),
+    "large": (4000, 3000),
+}
+
+_WORDS = ("patient report blood pressure glucose result normal range follow up "
+          "clinic sample analysis chart table value reference dose").split()
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _png(image) -> bytes:
+    import io
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _scanned_page(rng: random.Random, width: int = 1275, height: int = 1650):
+    """A 150 DPI letter page of text drawn as pixels, like a scan."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for line in range(60):
+        draw.text((80, 80 + line * 24), _paragraph(rng, 14), fill=0)
+    return image
+
+
+def _image(width: int, height: int, seed: int):
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = min(width, x0 + rng.randrange(10, width // 2 + 11)), min(height, y0 + rng.randrange(10, height // 2 + 11))
+        draw.rectangle([x0, y0, x1, y1], fill=tuple(rng.randrange(256) for _ in range(3)))
+    draw.text((10, 10), "Sample chart", fill="black")
+    return image
+
+
+def pdf_fixture(size: str) -> str:
+    """Return the path of a generated PDF of the given size name."""
+    import fitz
+
+    path = os.path.join(FIXTURE_DIR, f"report_{size}_v{FIXTURE_VERSION}.pdf")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    pages, images_per_page, scanned_every = PDF_SIZES[size]
+    rng = random.Random(pages)
+    png = _png(_image(600, 400, seed=pages)) if images_per_page else None
+    scan = _png(_scanned_page(rng)) if scanned_every else None
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        if scanned_every and page_num % scanned_every == scanned_every - 1:
+            page.insert_image(page.rect, stream=scan)
+            continue
+        page.insert_textbox(fitz.Rect(50, 50, 550, 400), _paragraph(rng, 300), fontsize=9)
+        for i in range(images_per_page):
+            top = 420 + i * 180
+            page.insert_image(fitz.Rect(50, top, 350, top + 170), stream=png)
+    doc.save(path, deflate=True)
+    doc.close()
+    return path
+
+
+def image_fixture(size: str) -> str:
+    """Return the path of a generated JPG of the given size name."""
+    path = os.path.join(FIXTURE_DIR, f"animal_{size}.jpg")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    width, height = IMAGE_SIZES[size]
+    _image(width, height, seed=width).save(path, format="JPEG", quality=90)
+    return path
+
+
+
+def text_fixture(megabytes: int) -> str:
+    """Return the path of a generated plain-text report of about megabytes MB."""
+    path = os.path.join(FIXTURE_DIR, f"report_{megabytes}mb.txt")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    rng = random.Random(megabytes)
+    target = megabytes * 1024 * 1024
+    written = 0
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        while written < target:
+            # Written a block at a time so generating the fixture stays small too
+            block = "\n\n".join(_paragraph(rng, 120) for _ in range(100)) + "\n\n"
+            f.write(block)
+            written += len(block)
+    os.replace(path + ".tmp", path)
+    return path
@@ -0,0 +1,111 @@
+"""Overload test for agent_common.serving: bounded queue vs unbounded queueing.
+
+The Summarizer graph is served with a fake LLM of fixed median latency, so
+its capacity is about workers / latency jobs per second. An open-loop
+client offers --overload times that rate for --duration seconds; each
+accepted job is followed to completion, rejected (429) jobs are counted
+and not retried. With a bounded queue the latency of accepted jobs stays
+flat for the whole run. With an unbounded queue every job is accepted and
+latency climbs as the backlog grows.
+
+Usage:
+    python -m benchmarks.load_test --workers 4 --llm-latency-ms 200 --overload 2 --duration 20
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from agent_common import remote
+from agent_common.agents import load_agent
+from agent_common.serving import create_server
+from benchmarks.fakes import FakeChatModelFactory, Latency
+from benchmarks.run_benchmarks import FAKE_ENV, percentile
+
+TEXT = "Quarterly results improved across all regions. " * 200
+
+
+def run_scenario(queue_size: int, args) -> dict:
+    server = create_server(["summarizer"], port=0, workers=args.workers, queue_size=queue_size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    state = {"input_type": "text", "input_text": TEXT, "text_content": [], "summary": ""}
+    results = []
+    lock = threading.Lock()
+
+    def one(offset_s: float):
+        start = time.perf_counter()
+        try:
+            job_id = remote.submit("summarizer", state, base_url)
+        except remote.ServerBusy:
+            outcome = (offset_s, "rejected", 0.0)
+        else:
+            remote.wait(job_id, timeout=3600, base_url=base_url)
+            outcome = (offset_s, "done", time.perf_counter() - start)
+        with lock:
+            results.append(outcome)
+
+    rate = args.overload * args.workers / (args.llm_latency_ms / 1000)
+    interval = 1 / rate
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.max_clients) as clients:
+        count = 0
+        while time.perf_counter() - started < args.duration:
+            # Open loop: arrivals keep coming on schedule whether or not earlier jobs finished
+            target = started + count * interval
+            time.sleep(max(0.0, target - time.perf_counter()))
+            clients.submit(one, target - started)
+            count += 1
+    wall_s = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+
+    done = sorted((offset, latency) for offset, status, latency in results if status == "done")
+    latencies = [latency for _, latency in done]
+    third = args.duration / 3
+    early = [latency for offset, latency in done if offset < third]
+    late = [latency for offset, latency in done if offset >= 2 * third]
+    return {
+        "offered_per_s": rate,
+        "submitted": len(results),
+        "rejected": sum(1 for _, status, _ in results if status == "rejected"),
+        "completed_per_s": len(done) / wall_s,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "p95_first_third": percentile(early, 95),
+        "p95_last_third": percentile(late, 95),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="Server worker threads")
+    parser.add_argument("--queue-size", type=int, default=8, help="Bounded queue size for the first scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Median fake LLM latency per job")
+    parser.add_argument("--overload", type=float, default=2.0, help="Offered load as a multiple of capacity")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of offered load")
+    parser.add_argument("--max-clients", type=int, default=1024, help="Concurrent client threads")
+    args = parser.parse_args(argv)
+
+    os.environ.update(FAKE_ENV)
+    module = load_agent("summarizer")
+    module.get_routed_chat_model = FakeChatModelFactory(Latency(args.llm_latency_ms))
+
+    scenarios = {f"bounded queue ({args.queue_size})": args.queue_size, "unbounded queue": 0}
+    print(f"{'':24} {'offered/s':>9} {'done/s':>7} {'rejected':>9} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+          f"{'p95 early':>9} {'p95 late':>9}")
+    for label, queue_size in scenarios.items():
+        r = run_scenario(queue_size, args)
+        print(f"{label:24} {r['offered_per_s']:9.1f} {r['completed_per_s']:7.1f} "
+              f"{r['rejected'] / max(1, r['submitted']):9.1%} {r['p50']:7.2f} {r['p95']:7.2f} {r['p99']:7.2f} "
+              f"{r['p95_first_third']:9.2f} {r['p95_last_third']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
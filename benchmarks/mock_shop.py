@@ -0,0 +1,191 @@
+"""A local mock shop and a lightweight WebDriver for the Addtocart agent.
+
+MockShop serves the product, cart and order-history pages the agent visits.
+FakeWebDriver fetches them over HTTP and implements the small part of the
+Selenium WebDriver API that addtocart.py and WebDriverWait use, so the
+benchmark runs without Chrome or chromedriver.
+"""
+import re
+import threading
+import urllib.request
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+PRODUCT_PATH = "/Gillette-Fusion5-Razor/dp/B0039LMTAQ"
+ORDER_ID = "111-0000000"  # The razor order; a newer, unrelated order is listed above it
+
+_PAGES = {
+    PRODUCT_PATH: """<html><head><title>Gillette Fusion5 Razor</title></head><body>
+<h1>Gillette Fusion5 Men's Razor</h1>
+<input id="add-to-cart-button" type="submit" value="Add to Cart" data-action="/cart/add">
+</body></html>""",
+    "/gp/cart/view.html": """<html><head><title>Shopping Cart</title></head><body>
+<div class="cart-item">Gillette Fusion5 Men's Razor</div>
+</body></html>""",
+    "/gp/your-account/order-history": """<html><head><title>Your Orders</title></head><body>
+<div class="order">Order #111-0000001 Arriving Friday <a href="/track/2">Track package</a></div>
+<div class="order">Order #111-0000000 Delivered today <a href="/track/1">Track package</a></div>
+</body></html>""",
+}
+
+
+class MockShop:
+    """Serves the shop pages on localhost; use as a context manager."""
+
+    def __init__(self, port: int = 0):
+        self.cart_adds = 0
+        shop = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/cart/add":
+                    shop.cart_adds += 1
+                    body = b"<html><head><title>Added</title></head><body>Added to Cart</body></html>"
+                elif self.path in _PAGES:
+                    body = _PAGES[self.path].encode("utf-8")
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def search_results(self, query: str):
+        """DuckDuckGo-shaped results pointing at the mock product page."""
+        return [
+            {"title": "Razor blades - Example", "href": "https://example.com/razors", "body": ""},
+            {"title": "Gillette Fusion5 Men's Razor", "href": self.base_url + PRODUCT_PATH, "body": ""},
+        ]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+class FakeElement:
+    def __init__(self, driver, tag: str, attrs: dict):
+        self.driver = driver
+        self.tag_name = tag
+        self.attrs = attrs
+        self.text = ""
+        self.children = []  # Descendant elements, in document order
+
+    def get_attribute(self, name: str):
+        value = self.attrs.get(name)
+        if name == "href" and value and value.startswith("/"):
+            return self.driver.base_url + value
+        return value
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return "disabled" not in self.attrs
+
+    def find_element(self, by: str, value: str):
+        # Only relative XPaths (".//a[...]") are scoped to the element
+        return self.driver._find(self.children, by, value.removeprefix("."))
+
+    def click(self):
+        action = self.attrs.get("data-action") or self.attrs.get("href")
+        if action:
+            self.driver.get(self.driver.base_url + action if action.startswith("/") else action)
+
+
+class _PageParser(HTMLParser):
+    def __init__(self, driver):
+        super().__init__()
+        self.driver = driver
+        self.elements = []
+        self.title = ""
+        self._open = []
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        element = FakeElement(self.driver, tag, dict(attrs))
+        self.elements.append(element)
+        for parent in self._open:
+            parent.children.append(element)
+        if tag != "input":
+            self._open.append(element)
+        self._in_title = tag == "title"
+
+    def handle_endtag(self, tag):
+        self._in_title = False
+        if self._open and self._open[-1].tag_name == tag:
+            self._open.pop()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        for element in self._open:
+            element.text += data
+
+
+class FakeWebDriver:
+    """HTTP-backed stand-in for webdriver.Chrome."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.current_url = ""
+        self.title = ""
+        self.page_loads = 0
+        self._elements = []
+
+    def get(self, url: str):
+        with urllib.request.urlopen(url, timeout=10) as response:
+            html = response.read().decode("utf-8")
+        self.page_loads += 1
+        parser = _PageParser(self)
+        parser.feed(html)
+        self.current_url = url
+        self.title = parser.title.strip()
+        self._elements = parser.elements
+        for element in self._elements:
+            element.text = " ".join(element.text.split())
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    def find_element(self, by: str, value: str):
+        return self._find(self._elements, by, value)
+
+    def find_elements(self, by: str, value: str):
+        return [element for element in self._elements if self._matches(element, by, value)]
+
+    def _find(self, elements, by: str, value: str):
+        for element in elements:
+            if self._matches(element, by, value):
+                return element
+        raise NoSuchElementException(f"{by}={value}")
+
+    def _matches(self, element: FakeElement, by: str, value: str) -> bool:
+        if by == By.ID:
+            return element.attrs.get("id") == value
+        if by == By.CLASS_NAME:
+            return value in (element.attrs.get("class") or "").split()
+        if by == By.XPATH:
+            match = re.fullmatch(r"//(\w+)\[contains\(text\(\), '([^']*)'\)\]", value)
+            if not match:
+                raise NotImplementedError(f"Unsupported XPath: {value}")
+            return element.tag_name == match.group(1) and match.group(2) in element.text
+        raise NotImplementedError(f"Unsupported locator: {by}")
+
+    def quit(self):
+        pass
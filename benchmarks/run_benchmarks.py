@@ -0,0 +1,399 @@
+"""Offline benchmark suite for every agent.
+
+Each agent script is imported with its LLM, search, OCR and transcript
+clients replaced by the stubs in benchmarks/fakes.py, and the Addtocart
+agent drives the local mock shop. Each agent runs in its own subprocess so
+its peak RSS is measured in isolation.
+
+Usage:
+    python -m benchmarks.run_benchmarks                       # all agents
+    python -m benchmarks.run_benchmarks --agents summarizer --iterations 20
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from agent_common.agents import AGENTS, load_agent
+from benchmarks.fakes import (
+    FakeChatModel, FakeChatModelFactory, FakeDDGS, FakeGenAI, FakeOpenAIClient,
+    FakeTavilySearch, FakeTesseract, FakeTranscriptApi, Latency, count_requested,
+)
+from benchmarks.fixtures import IMAGE_SIZES, PDF_SIZES, image_fixture, pdf_fixture, text_fixture
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# Dummy keys so the agents' start-up checks pass; nothing reaches the network.
+FAKE_ENV = {
+    "OPENAI_API_KEY": "offline-benchmark",
+    "GROQ_API_KEY1": "offline-benchmark",
+    "TAVILY_API_KEY": "offline-benchmark",
+    "GOOGLE_API_KEY": "offline-benchmark",
+    "AGENT_METRICS_DISABLED": "1",
+}
+
+
+# Each case builder patches the loaded module and yields (scenario, run).
+def document_extractor_cases(module, args):
+    module.get_routed_chat_model = FakeChatModelFactory(Latency(args.llm_latency_ms))
+    module.pytesseract = FakeTesseract(Latency(args.ocr_latency_ms))
+    for size in args.pdf_sizes:
+        with open(pdf_fixture(size), "rb") as f:
+            pdf_bytes = f.read()
+        yield f"pdf_{size}", lambda pdf_bytes=pdf_bytes: module.app.invoke({
+            "input_type": "pdf_bytes",
+            "pdf_path": f"report_{size}.pdf",
+            "pdf_bytes": pdf_bytes,
+            "text_content": [],
+            "image_content": [],
+            "image_count": 0,
+            "scanned_pages": [],
+            "ocr_results": [],
+            "reasoning_output": [],
+        })
+
+
+def summarizer_cases(module, args):
+    module.get_routed_chat_model = FakeChatModelFactory(Latency(args.llm_latency_ms))
+    for size in args.pdf_sizes:
+        with open(pdf_fixture(size), "rb") as f:
+            pdf_bytes = f.read()
+        yield f"pdf_{size}", lambda pdf_bytes=pdf_bytes: module.app.invoke({
+            "input_type": "pdf_bytes", "input_path": f"report_{size}.pdf", "pdf_bytes": pdf_bytes,
+            "text_content": [], "summary": ""
+        })
+    text = "Quarterly results improved across all regions. " * 2000
+    yield "text_100kb", lambda: module.app.invoke({
+        "input_type": "text", "input_text": text, "text_content": [], "summary": ""
+    })
+    text_path = text_fixture(1)
+    yield "text_file_1mb", lambda: module.app.invoke({
+        "input_type": "text_file", "input_path": text_path, "text_content": [], "summary": ""
+    })
+
+
+def blog_generator_cases(module, args):
+    module.llm = FakeChatModel(Latency(args.llm_latency_ms))
+    module.web_search = FakeTavilySearch(Latency(args.search_latency_ms))
+    yield "single_topic", lambda: module.app.invoke({
+        "topic": "Benefits of Search & AI", "research": "", "blog": "", "feedback": ""
+    })
+    yield "with_feedback", lambda: module.app.invoke({
+        "topic": "Benefits of Search & AI", "research": "", "blog": "", "feedback": "improve clarity"
+    })
+    # A product line's feature topics: near-duplicates share one search per cluster
+    topics = [f"{product} camera {feature}" for product in ("X200", "X300")
+              for feature in ("low light features", "low light performance", "battery life", "battery life tips",
+                              "video features", "video recording features")]
+    yield "bulk_12_topics", lambda: module.bulk_generate(topics, max_workers=4)
+
+
+def image_recognition_cases(module, args):
+    module.client = FakeOpenAIClient(Latency(args.llm_latency_ms))
+    for size in args.image_sizes:
+        with open(image_fixture(size), "rb") as f:
+            image_bytes = f.read()
+        yield f"jpg_{size}", lambda image_bytes=image_bytes: module.app.invoke({
+            "image": image_bytes, "description": ""
+        })
+
+
+def orchestrator_synthesizer_cases(module, args):
+    module.llm = FakeChatModel(Latency(args.llm_latency_ms))
+    module.DDGS = FakeDDGS(Latency(args.search_latency_ms))
+    yield "campaign", lambda: module.app.invoke({
+        "topic": "Eco-Friendly Products", "ideas": "", "research": "", "draft": "", "final_post": ""
+    })
+
+
+def add_to_cart_cases(module, args):
+    from benchmarks.mock_shop import ORDER_ID, FakeWebDriver, MockShop
+
+    with MockShop() as shop:
+        module.SHOP_BASE_URL = shop.base_url
+        module.SHOP_DOMAIN = shop.base_url.split("://", 1)[1]
+        module.CART_UPDATE_WAIT = 0  # Think time is not part of the agent's cost
+        module.DDGS = FakeDDGS(Latency(args.search_latency_ms), results=shop.search_results)
+        app = module.build_workflow()
+
+        def run():
+            # The non-interactive run stops at the cart; the order is then tracked on its own
+            driver = FakeWebDriver(shop.base_url)
+            with contextlib.redirect_stdout(io.StringIO()):
+                state = app.invoke({
+                    "driver": driver,
+                    "product_url": None,
+                    "in_cart": False,
+                    "payment_done": False,
+                    "shipping_status": "pending",
+                    "tracking_url": "",
+                    "order_id": "",
+                    "max_checks": 1,
+                    "interactive": False,
+                })
+                if state["shipping_status"] != "awaiting_payment":
+                    raise RuntimeError(f"Unexpected cart status {state['shipping_status']!r}")
+                state = module.tracer.wrap("track", module.track_shipping)({
+                    "driver": driver, "payment_done": True, "order_id": ORDER_ID, "max_checks": 1,
+                    "shipping_status": "pending", "tracking_url": "",
+                })
+            if state["shipping_status"] != "delivered":
+                raise RuntimeError(f"Unexpected shipping status {state['shipping_status']!r}")
+
+        yield "mock_shop", run
+
+
+def hitl_feedback_cases(module, args):
+    def analyst(i):
+        return module.Analyst(affiliation=f"Lab {i}", name=f"Analyst {i}", role="Researcher",
+                              description="Focuses on adoption risks and benefits.")
+
+    def perspectives(prompt_text):
+        return module.Perspectives(analysts=[analyst(i) for i in range(count_requested(prompt_text))])
+
+    def themes(prompt_text):
+        return module.Themes(themes=[f"Theme {i}" for i in range(count_requested(prompt_text))])
+
+    module.llm = FakeChatModel(Latency(args.llm_latency_ms), structured={
+        module.Perspectives: perspectives,
+        module.Themes: themes,
+        module.Analyst: lambda prompt_text: analyst(0),
+    })
+    counter = iter(range(10**9))
+
+    def generate(analysts, mode):
+        thread = {"configurable": {"thread_id": f"bench-{next(counter)}"}}
+        module.graph.invoke({"topic": "Robotics in Physical AI", "max_analysts": analysts, "generation_mode": mode}, thread)
+        return thread
+
+    def feedback_round(analysts, mode):
+        thread = generate(analysts, mode)
+        module.graph.update_state(thread, {"human_analyst_feedback": "Make analyst 2 a regulator."}, as_node="human_feedback")
+        module.graph.invoke(None, thread)
+
+    for mode in ("single", "parallel"):
+        for analysts in (1, 5):
+            yield f"{mode}_analysts_{analysts}", lambda analysts=analysts, mode=mode: generate(analysts, mode)
+        yield f"{mode}_feedback_5", lambda mode=mode: feedback_round(5, mode)
+
+
+def youtube_summarizer_cases(module, args):
+    module.get_gemini_model = FakeGenAI(Latency(args.llm_latency_ms)).GenerativeModel
+    module.YouTubeTranscriptApi = FakeTranscriptApi(Latency(args.search_latency_ms))
+
+    def run():
+        transcript = module.extract_transcript_details("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        if not module.generate_gemini_content(transcript, module.prompt):
+            raise RuntimeError("No summary generated")
+
+    yield "transcript", run
+
+
+CASES = {
+    "document_extractor": document_extractor_cases,
+    "summarizer": summarizer_cases,
+    "blog_generator": blog_generator_cases,
+    "image_recognition": image_recognition_cases,
+    "orchestrator_synthesizer": orchestrator_synthesizer_cases,
+    "add_to_cart": add_to_cart_cases,
+    "hitl_feedback": hitl_feedback_cases,
+    "youtube_summarizer": youtube_summarizer_cases,
+}
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(run, iterations: int, warmup: int) -> dict:
+    """Time iterations of run(), then one traced run for peak Python memory."""
+    for _ in range(warmup):
+        run()
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        try:
+            run()
+        except Exception as e:
+            errors += 1
+            print(f"  error: {e!r}", file=sys.stderr)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        run()
+    except Exception:
+        pass
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "throughput_per_s": round(iterations / total, 3) if total else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "peak_python_memory_bytes": peak,
+    }
+
+
+def run_agent(name: str, args) -> list:
+    """Benchmark one agent in this process (used by the worker subprocess)."""
+    os.environ.update(FAKE_ENV)
+    module = load_agent(name)
+    results = []
+    for scenario, run in CASES[name](module, args):
+        print(f"{name}/{scenario} ...", file=sys.stderr)
+        result = {"agent": name, "scenario": scenario, **measure(run, args.iterations, args.warmup)}
+        result["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        results.append(result)
+    return results
+
+
+def _git_version() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_all(args) -> dict:
+    results = []
+    for name in args.agents:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            worker_output = f.name
+        command = [sys.executable, "-m", "benchmarks.run_benchmarks", "--worker", name,
+                   "--worker-output", worker_output] + _config_argv(args)
+        completed = subprocess.run(command, cwd=REPO_ROOT)
+        if completed.returncode != 0:
+            print(f"{name}: benchmark worker failed with exit code {completed.returncode}", file=sys.stderr)
+            results.append({"agent": name, "scenario": "*", "failed": True})
+        else:
+            with open(worker_output, encoding="utf-8") as f:
+                results.extend(json.load(f))
+        os.remove(worker_output)
+    return {
+        "version": args.label or _git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: getattr(args, key) for key in _CONFIG_KEYS},
+        "results": results,
+    }
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print per-scenario deltas; return 1 if any metric regressed past threshold."""
+    with open(base_path, encoding="utf-8") as f:
+        base = {(r["agent"], r["scenario"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    regressed = False
+    print(f"{'agent/scenario':45} {'p50 ms':>18} {'p95 ms':>18} {'peak RSS MB':>18}")
+    for result in new:
+        old = base.get((result["agent"], result["scenario"]))
+        if old is None or result.get("failed") or old.get("failed"):
+            continue
+        cells = []
+        for key, scale in (("p50_ms", 1), ("p95_ms", 1), ("peak_rss_bytes", 1 / 2**20)):
+            change = (result[key] - old[key]) / old[key] if old[key] else 0.0
+            flag = "!" if change > threshold else " "
+            regressed |= change > threshold
+            cells.append(f"{result[key] * scale:9.1f} {change:+6.1%}{flag}")
+        print(f"{result['agent'] + '/' + result['scenario']:45} " + " ".join(cells))
+    return 1 if regressed else 0
+
+
+_CONFIG_KEYS = ("iterations", "warmup", "llm_latency_ms", "search_latency_ms", "ocr_latency_ms",
+                "pdf_sizes", "image_sizes")
+
+
+def _config_argv(args) -> list:
+    return [
+        "--iterations", str(args.iterations),
+        "--warmup", str(args.warmup),
+        "--llm-latency-ms", str(args.llm_latency_ms),
+        "--search-latency-ms", str(args.search_latency_ms),
+        "--ocr-latency-ms", str(args.ocr_latency_ms),
+        "--pdf-sizes", ",".join(args.pdf_sizes),
+        "--image-sizes", ",".join(args.image_sizes),
+    ]
+
+
+def _csv(choices):
+    def parse(value):
+        items = list(choices) if value == "all" else [v.strip() for v in value.split(",") if v.strip()]
+        unknown = [v for v in items if v not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown value(s): {', '.join(unknown)}")
+        return items
+    return parse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=_csv(AGENTS), default=list(AGENTS), help="Comma-separated agents or 'all'")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Median stub LLM latency")
+    parser.add_argument("--search-latency-ms", type=float, default=100.0, help="Median stub search/transcript latency")
+    parser.add_argument("--ocr-latency-ms", type=float, default=20.0, help="Median stub OCR latency per image")
+    parser.add_argument("--pdf-sizes", type=_csv(PDF_SIZES), default=["small", "medium", "large"],
+                        help=f"Comma-separated subset of {', '.join(PDF_SIZES)}")
+    parser.add_argument("--image-sizes", type=_csv(IMAGE_SIZES), default=list(IMAGE_SIZES))
+    parser.add_argument("--label", help="Version label for the results file (default: git describe)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<label>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two results files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold for --compare")
+    parser.add_argument("--worker", choices=list(AGENTS), help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+    if args.worker:
+        results = run_agent(args.worker, args)
+        with open(args.worker_output, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+        return 0
+
+    report = run_all(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['version']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n{'agent/scenario':45} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'peak RSS MB':>12}")
+    for r in report["results"]:
+        if r.get("failed"):
+            print(f"{r['agent'] + '/*':45} FAILED")
+            continue
+        print(f"{r['agent'] + '/' + r['scenario']:45} {r['throughput_per_s']:8.2f} {r['p50_ms']:9.1f} "
+              f"{r['p95_ms']:9.1f} {r['peak_rss_bytes'] / 2**20:12.1f}")
+    print(f"\nResults written to {output}")
+    return 1 if any(r.get("failed") for r in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
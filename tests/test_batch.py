@@ -0,0 +1,40 @@
+"""Batch runner helpers in agent_common.batch."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common import batch
+
+
+def test_ocr_threads_are_shared_between_worker_processes(monkeypatch):
+    monkeypatch.delenv("OCR_WORKERS", raising=False)
+    monkeypatch.setattr(batch.os, "cpu_count", lambda: 8)
+    assert batch.ocr_workers_per_process(8) == 1
+    assert batch.ocr_workers_per_process(2) == 4
+    assert batch.ocr_workers_per_process(16) == 1
+    monkeypatch.setenv("OCR_WORKERS", "3")
+    assert batch.ocr_workers_per_process(8) == 3
+
+
+def test_find_files_expands_directories_and_globs(tmp_path):
+    (tmp_path / "reports" / "2024").mkdir(parents=True)
+    for name in ("reports/a.pdf", "reports/2024/b.pdf", "reports/notes.txt", "loose.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF")
+
+    found = batch.find_files([str(tmp_path / "reports"), str(tmp_path / "*.pdf"), str(tmp_path / "reports")], "*.pdf")
+    assert found == sorted(str(tmp_path / name) for name in ("reports/a.pdf", "reports/2024/b.pdf", "loose.pdf"))
+    assert batch.find_files([str(tmp_path / "missing")], "*.pdf") == []
+
+
+def test_checkpoint_skips_ok_files_and_retries_errors(tmp_path):
+    output = tmp_path / "results.jsonl"
+    assert batch.load_checkpoint(str(output)) == set()
+    output.write_text(
+        '{"file": "/a.pdf", "status": "ok"}\n'
+        '{"file": "/b.pdf", "status": "error", "error": "ValueError: No text extracted"}\n'
+        '{"file": "/c.pdf", "status": "error"}\n'
+        '{"file": "/c.pdf", "status": "ok"}\n'
+        '{"file": "/d.pdf", "stat',  # Interrupted mid-write
+        encoding="utf-8")
+    assert batch.load_checkpoint(str(output)) == {"/a.pdf", "/c.pdf"}
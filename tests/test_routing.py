@@ -0,0 +1,140 @@
+"""HedgedRouter behaviour against the fake providers in benchmarks.fakes."""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common import routing
+from agent_common.routing import HedgedRouter
+from benchmarks.fakes import FakeChatModel, Latency
+from benchmarks.run_benchmarks import percentile
+
+
+class TimingOutModel(FakeChatModel):
+    def invoke(self, prompt, config=None, **_):
+        self.calls += 1
+        raise TimeoutError("last provider")
+
+
+class ContextTooLong(Exception):
+    status_code = 400
+
+
+class SmallContextModel(FakeChatModel):
+    """Answers short prompts and rejects long ones like an 8k-context model."""
+
+    def invoke(self, prompt, config=None, **kwargs):
+        if len(str(prompt)) > 100:
+            self.calls += 1
+            raise ContextTooLong("This model's maximum context length is 8192 tokens")
+        return super().invoke(prompt, config, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    routing._stats.clear()
+    yield
+    routing._stats.clear()
+
+
+def test_fails_over_to_next_provider_on_error():
+    primary = FakeChatModel(error_rate=1.0)
+    secondary = FakeChatModel()
+    router = HedgedRouter([("primary", primary), ("secondary", secondary)], hedging=False)
+
+    assert router.invoke("hello").content
+    assert (primary.calls, secondary.calls) == (1, 1)
+    assert (router.failovers, router.hedge_wins) == (1, 0)
+
+
+def test_raises_last_error_when_every_provider_fails():
+    first = FakeChatModel(error_rate=1.0)
+    last = TimingOutModel()
+    router = HedgedRouter([("first", first), ("last", last)], hedging=False)
+
+    with pytest.raises(TimeoutError, match="last provider"):
+        router.invoke("hello")
+    assert (first.calls, last.calls) == (1, 1)
+
+
+def test_hedge_beats_straggler():
+    straggler = FakeChatModel(Latency(tail_prob=1.0, tail_ms=1000, spread=0.0))
+    steady = FakeChatModel(Latency(10, spread=0.0))
+    router = HedgedRouter([("straggler", straggler), ("steady", steady)],
+                          hedging=True, default_delay_s=0.05, min_delay_s=0.0)
+
+    start = time.perf_counter()
+    router.invoke("hello")
+    assert time.perf_counter() - start < 0.5
+    assert (router.hedges_sent, router.hedge_wins) == (1, 1)
+
+
+def test_hedging_improves_p99_on_slow_tail():
+    def drive(llm, requests=400):
+        def one(_):
+            start = time.perf_counter()
+            llm.invoke("hello")
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(8) as pool:
+            return list(pool.map(one, range(requests)))
+
+    def primary():
+        # 3% stragglers: rarer than the p95 hedge point, common enough to set p99
+        return FakeChatModel(Latency(10, seed=1, tail_prob=0.03, tail_ms=400))
+
+    direct = drive(primary())
+    routing._stats.clear()
+    router = HedgedRouter([("primary", primary()), ("secondary", FakeChatModel(Latency(15, seed=2)))],
+                          hedging=True, default_delay_s=0.05, min_delay_s=0.0)
+    hedged = drive(router)
+
+    assert percentile(direct, 99) > 0.3
+    assert percentile(hedged, 99) < percentile(direct, 99) / 3
+    assert router.hedge_wins > 0
+
+
+def test_hedge_delay_is_learnt_per_call_site():
+    fast = FakeChatModel(Latency(2, spread=0.0))
+    short_calls = HedgedRouter([("primary", fast), ("secondary", FakeChatModel())], call_site="chat",
+                               default_delay_s=1.0, min_delay_s=0.0)
+    for _ in range(25):
+        short_calls.invoke("hi")
+
+    slow = FakeChatModel(Latency(100, spread=0.0))
+    long_calls = HedgedRouter([("primary", slow), ("secondary", FakeChatModel())], call_site="chunks",
+                              default_delay_s=1.0, min_delay_s=0.0)
+    long_calls.invoke("a long chunk")
+
+    assert short_calls.hedge_delay("primary") < 0.05
+    assert long_calls.hedge_delay("primary") == 1.0
+    assert long_calls.hedges_sent == 0
+
+
+def test_no_hedge_while_executor_is_saturated(monkeypatch):
+    monkeypatch.setattr(routing, "executor_saturated", lambda: True)
+    straggler = FakeChatModel(Latency(tail_prob=1.0, tail_ms=200, spread=0.0))
+    steady = FakeChatModel()
+    router = HedgedRouter([("straggler", straggler), ("steady", steady)],
+                          hedging=True, default_delay_s=0.02, min_delay_s=0.0)
+
+    router.invoke("hello")
+    assert router.hedges_sent == 0
+    assert steady.calls == 0
+
+
+def test_context_errors_stay_with_their_call_site():
+    small = SmallContextModel()
+    long_docs = HedgedRouter([("llama3", small), ("openai", FakeChatModel())], hedging=False, call_site="summarizer")
+    for _ in range(20):
+        assert long_docs.invoke("x" * 500).content
+
+    # Long documents now go to openai first, but llama3 is still healthy for short chat prompts
+    assert [name for name, _ in long_docs.ranked()] == ["openai", "llama3"]
+    chat = HedgedRouter([("llama3", small), ("openai", FakeChatModel())], hedging=False, call_site="hitl")
+    assert [name for name, _ in chat.ranked()] == ["llama3", "openai"]
+    assert routing.get_stats("llama3").error_rate == 0.0
@@ -0,0 +1,104 @@
+"""Request handling of the job server in agent_common.serving."""
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common import remote
+from agent_common.serving import AgentPool, create_server
+
+
+@pytest.fixture
+def server():
+    # No workers: jobs stay queued, and the agent is never imported
+    server = create_server(["summarizer"], port=0, workers=0, queue_size=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, body):
+    request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}{path}",
+                                     data=json.dumps(body).encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def get(server, path):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_non_numeric_wait_is_a_bad_request(server):
+    job = server.jobs.add("summarizer", {})
+    assert get(server, f"/jobs/{job['id']}?wait=abc") == (400, {"error": "wait must be a number of seconds"})
+    status, body = get(server, f"/jobs/{job['id']}?wait=0")
+    assert (status, body["status"]) == (200, "queued")
+
+
+def test_unknown_job_is_not_found(server):
+    assert get(server, "/jobs/missing")[0] == 404
+
+
+def test_full_queue_answers_429_with_retry_after(server):
+    status, _, body = post(server, "/agents/summarizer/jobs", {"input_type": "text", "input_text": "a"})
+    assert status == 202
+    status, headers, rejected = post(server, "/agents/summarizer/jobs", {"input_type": "text", "input_text": "b"})
+    assert status == 429
+    assert int(headers["Retry-After"]) >= 1 and rejected["retry_after_s"] == int(headers["Retry-After"])
+    # The rejected job is not kept; only the accepted one is
+    assert list(server.jobs._jobs) == [body["job_id"]]
+
+
+def test_uploaded_file_reaches_the_job_as_a_path(server):
+    marker = remote.upload("héllo wörld".encode("utf-8"), base_url(server))
+    job_id = remote.submit("summarizer", {"input_type": "text_file", "input_path": marker}, base_url(server))
+    path = server.jobs.get(job_id)["state"]["input_path"]
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "héllo wörld"
+    # The accepted job now owns the file, so the upload id cannot be used again
+    status, _, body = post(server, "/agents/summarizer/jobs", {"input_path": marker})
+    assert status == 400 and "Unknown or expired upload" in body["error"]
+
+
+def test_upload_survives_a_rejected_job(server):
+    post(server, "/agents/summarizer/jobs", {})  # Fills the one-slot queue
+    marker = remote.upload(b"text", base_url(server))
+    assert post(server, "/agents/summarizer/jobs", {"input_path": marker})[0] == 429
+    assert marker["__upload__"] in server.uploads._uploads
+
+
+def test_oversized_job_body_is_refused(server):
+    server.max_body_bytes = 64
+    status, _, body = post(server, "/agents/summarizer/jobs", {"input_text": "x" * 100})
+    assert status == 413 and "/uploads" in body["error"]
+    assert server.jobs._jobs == {}
+
+
+def test_worker_deletes_the_job_uploads(server):
+    marker = remote.upload(b"text", base_url(server))
+    pool = AgentPool("summarizer", lambda module, state: {"summary": "ok"}, workers=1, queue_size=1)
+    pool._module = object()
+    server.pools["summarizer"] = pool
+    path = server.uploads._uploads[marker["__upload__"]][0]
+    job_id = remote.submit("summarizer", {"input_type": "text_file", "input_path": marker}, base_url(server))
+    assert remote.wait(job_id, timeout=5, base_url=base_url(server)) == {"summary": "ok"}
+    assert not os.path.exists(path)
@@ -0,0 +1,51 @@
+"""Windowed text chunking in agent_common.text_chunks."""
+import mmap
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common import text_chunks
+from agent_common.text_chunks import iter_text_chunks
+
+# 1-, 2-, 3- and 4-byte UTF-8 characters, so window edges fall inside characters
+TEXT = "".join(f"Zeile {i}: größer café naïve 東京 データ 🙂 emoji.\n" for i in range(2000))
+
+
+@pytest.fixture
+def small_windows(monkeypatch):
+    # The smallest window mmap allows, so a ~150 KB file spans dozens of windows
+    monkeypatch.setattr(text_chunks, "MMAP_WINDOW_BYTES", mmap.ALLOCATIONGRANULARITY)
+
+
+def test_file_chunks_rejoin_to_the_original_text(tmp_path, small_windows):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(TEXT.encode("utf-8"))
+    assert os.path.getsize(path) > 10 * text_chunks.MMAP_WINDOW_BYTES
+
+    chunks = list(iter_text_chunks(str(path), 1000))
+    assert "".join(chunks) == TEXT
+    assert "�" not in "".join(chunks)
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    # Chunks end on a line break or space where possible
+    assert all(chunk[-1] in "\n " for chunk in chunks[:-1])
+
+
+def test_bytes_chunks_survive_odd_window_sizes(monkeypatch):
+    data = TEXT.encode("utf-8")
+    for window in (1, 7, 4093):
+        monkeypatch.setattr(text_chunks, "MMAP_WINDOW_BYTES", window)
+        assert "".join(iter_text_chunks(data, 300)) == TEXT
+
+
+def test_unbroken_text_is_cut_at_chunk_chars(small_windows):
+    text = "東" * 2500
+    assert [len(chunk) for chunk in iter_text_chunks(text.encode("utf-8"), 1000)] == [1000, 1000, 500]
+
+
+def test_invalid_bytes_and_empty_input():
+    assert "".join(iter_text_chunks(b"ok \xff\xfe done", 100)) == "ok �� done"
+    assert list(iter_text_chunks(b"", 100)) == []
+    assert list(iter_text_chunks(b"  \n ", 100)) == []
@@ -0,0 +1,55 @@
+"""Bulk blog topic clustering in agent_common.topics."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_common.topics import cluster_topics, combined_query, shares_subject
+
+BENCH_TOPICS = [f"{product} camera {feature}" for product in ("X200", "X300")
+                for feature in ("low light features", "low light performance", "battery life", "battery life tips",
+                                "video features", "video recording features")]
+
+
+def groups(topics):
+    return [c["topics"] for c in cluster_topics(topics)]
+
+
+def test_every_cluster_shares_its_subject():
+    topics = BENCH_TOPICS + ["Python for data science", "Rust for data science", "Top tips", "Best tips"]
+    for cluster in cluster_topics(topics):
+        assert len(cluster["topics"]) == 1 or shares_subject(cluster["topics"]), cluster["topics"]
+
+
+def test_facets_of_one_subject_share_research():
+    assert groups(["X200 camera low light features", "X200 camera low light performance"]) == [
+        ["X200 camera low light features", "X200 camera low light performance"]]
+    assert groups(["X200 camera battery life", "X200 camera battery life tips"]) == [
+        ["X200 camera battery life", "X200 camera battery life tips"]]
+
+
+def test_product_name_alone_does_not_cluster():
+    assert len(groups(["X200 camera video features", "X200 camera low light features"])) == 2
+    assert len(groups(["X200 camera battery life", "X300 camera battery life"])) == 2
+    assert len(groups(["Python for data science", "Rust for data science"])) == 2
+    assert len(groups(["Top tips", "Best tips"])) == 2
+
+
+def test_benchmark_topics_cluster_per_product_and_subject():
+    clusters = cluster_topics(BENCH_TOPICS)
+    assert len(clusters) == 8
+    for cluster in clusters:
+        products = {t.split()[0] for t in cluster["topics"]}
+        assert len(products) == 1, cluster["topics"]
+
+
+def test_duplicates_are_dropped():
+    assert groups(["Battery Life of the X200", "x200 battery life", "the battery life of X200s"]) == [
+        ["Battery Life of the X200"]]
+
+
+def test_cluster_is_searched_with_all_its_words():
+    assert combined_query(["X200 camera low light features", "X200 camera low light performance"]) == (
+        "X200 camera low light features performance")
+    assert cluster_topics(["X200 camera battery life", "X200 camera battery life tips"])[0]["query"] == (
+        "X200 camera battery life tips")